@@ -3,35 +3,74 @@ Database configuration and session management.
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from .models import Base
+from sqlalchemy.pool import QueuePool
+from .models import Base, Proposal
 
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./proposals.db")
 
+# Connection pool sizing (shared by the API, background agents and scripts)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
 # Create engine with connection pooling and timeout settings
 connect_args = {}
+pool_args = {}
 if "sqlite" in DATABASE_URL:
     connect_args = {
         "check_same_thread": False,
         "timeout": 10.0  # 10 second timeout for SQLite operations
     }
+if ":memory:" not in DATABASE_URL:
+    # File-backed SQLite and server databases share a LIFO queue pool so the
+    # simulation agent and API workers keep reusing the most recently used
+    # (warm) connections instead of cycling through idle ones
+    pool_args = {
+        "poolclass": QueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_use_lifo": True,
+    }
 
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
     pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600  # Recycle connections after 1 hour
+    pool_recycle=3600,  # Recycle connections after 1 hour
+    **pool_args
 )
 
+if "sqlite" in DATABASE_URL:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+        """
+        WAL lets readers proceed during writes and, with synchronous=NORMAL,
+        avoids an fsync per commit (still safe against application crashes).
+        """
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Session factory for background agents: objects stay readable after the
+# per-tick commit so cached snapshots are not reloaded attribute by attribute
+AgentSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
 
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    # create_all() skips indexes on tables that already exist
+    for index in Proposal.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 
 def get_db():
@@ -21,11 +21,34 @@ EMAIL_FROM = os.getenv("EMAIL_FROM", SMTP_USERNAME)
 EMAIL_FROM_NAME = os.getenv("EMAIL_FROM_NAME", "SmartBoard Team")
 
 
+def open_smtp_connection() -> Optional[smtplib.SMTP]:
+    """
+    Open an authenticated SMTP connection for sending several emails.
+    
+    The caller owns the connection and should ``quit()`` it when done.
+    
+    Returns:
+        Logged-in SMTP connection, or None if email is not configured
+    """
+    if not SMTP_USERNAME or not SMTP_PASSWORD:
+        return None
+    
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+    try:
+        server.starttls()
+        server.login(SMTP_USERNAME, SMTP_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
 def send_email(
     to_email: str,
     subject: str,
     message: str,
-    html_message: Optional[str] = None
+    html_message: Optional[str] = None,
+    server: Optional[smtplib.SMTP] = None
 ) -> bool:
     """
     Send an email using SMTP.
@@ -35,6 +58,8 @@ def send_email(
         subject: Email subject
         message: Plain text message body
         html_message: Optional HTML message body
+        server: Optional open connection from open_smtp_connection() to reuse
+            instead of connecting (and doing the TLS handshake) per message
     
     Returns:
         True if email was sent successfully, False otherwise
@@ -64,10 +89,13 @@ def send_email(
             msg.attach(html_part)
         
         # Connect to SMTP server and send
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        if server is not None:
             server.send_message(msg)
+        else:
+            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+                server.starttls()
+                server.login(SMTP_USERNAME, SMTP_PASSWORD)
+                server.send_message(msg)
         
         logger.info(f"Email sent successfully to {to_email}")
         return True
@@ -80,13 +108,18 @@ def send_email(
         return False
 
 
-def send_congratulations_email(wallet_address: str, email: str) -> bool:
+def send_congratulations_email(
+    wallet_address: str,
+    email: str,
+    server: Optional[smtplib.SMTP] = None
+) -> bool:
     """
     Send a congratulations email when a user adds their email.
     
     Args:
         wallet_address: User's wallet address
         email: User's email address
+        server: Optional open SMTP connection to reuse
     
     Returns:
         True if email was sent successfully, False otherwise
@@ -181,7 +214,7 @@ The SmartBoard Team
 </html>
     """.strip()
     
-    return send_email(email, subject, plain_message, html_message)
+    return send_email(email, subject, plain_message, html_message, server=server)
 
 
 def send_proposal_outcome_email(
@@ -11,6 +11,8 @@ import logging
 from pathlib import Path
 from typing import Dict, Any
 
+from spoon_agent.storacha_cid import BARE_CID_RE, STORACHA_LINK_CID_RE
+
 logger = logging.getLogger(__name__)
 
 DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
@@ -95,9 +97,7 @@ def upload_json_to_ipfs(data: Dict[str, Any], filename: str = "data.json") -> st
         cid = None
         
         # Try to find CID in various formats
-        cid_match = re.search(r"storacha\.link/ipfs/([a-zA-Z0-9]+)", output)
-        if not cid_match:
-            cid_match = re.search(r"(bafy[a-zA-Z0-9]+)", output)
+        cid_match = STORACHA_LINK_CID_RE.search(output) or BARE_CID_RE.search(output)
         if not cid_match:
             cid_match = re.search(r"(Qm[a-zA-Z0-9]+)", output)
         
@@ -20,7 +20,7 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from dotenv import load_dotenv
-from .db import get_db, init_db, SessionLocal
+from .db import get_db, init_db, SessionLocal, AgentSessionLocal
 from .models import Proposal as DBProposal, Vote as DBVote, User as DBUser, Organization as DBOrganization
 from .neo_client import NeoClient
 from .startup_discovery import (
@@ -101,6 +101,8 @@ SIMULATED_VOTING_MAX_VOTES_PER_PROPOSAL = int(
     os.getenv("SIMULATED_VOTING_MAX_VOTES_PER_PROPOSAL", "200"))
 SIMULATED_VOTING_YES_PROBABILITY = float(
     os.getenv("SIMULATED_VOTING_YES_PROBABILITY", "0.65"))
+SIMULATED_VOTING_REFRESH_SECONDS = float(
+    os.getenv("SIMULATED_VOTING_REFRESH_SECONDS", "5.0"))
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -203,7 +205,8 @@ async def startup_event():
                 interval_seconds=SIMULATED_VOTING_INTERVAL_SECONDS,
                 max_votes_per_proposal=SIMULATED_VOTING_MAX_VOTES_PER_PROPOSAL,
                 yes_probability=SIMULATED_VOTING_YES_PROBABILITY,
-                db_factory=SessionLocal
+                refresh_seconds=SIMULATED_VOTING_REFRESH_SECONDS,
+                db_factory=AgentSessionLocal
             )
             simulated_voting_agent.start()
             logger.info(
@@ -6,6 +6,8 @@ Responsibilities:
 - Upload manifest to Storacha/IPFS (optional)
 - Keep the latest manifest CID in-memory for reuse
 - Fail-open: if upload or generation fails, logs and returns gracefully
+- Coalesce bursts: each upload pays the Storacha CLI's Node startup, so
+  refresh requests arriving while one is still queued share that run
 """
 import json
 import logging
@@ -13,10 +15,13 @@ import os
 import shutil
 import subprocess
 import tempfile
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+from spoon_agent.storacha_cid import BARE_CID_RE, STORACHA_LINK_CID_RE
+
 from .db import SessionLocal
 from .models import Proposal
 
@@ -30,6 +35,8 @@ INITIAL_MANIFEST_CID = os.getenv("STORACHA_MANIFEST_CID")
 
 _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="manifest-refresh")
 _latest_manifest_cid: Optional[str] = INITIAL_MANIFEST_CID
+_pending_refresh: Optional[Future] = None
+_pending_lock = threading.Lock()
 
 
 def _generate_manifest_file() -> Optional[Path]:
@@ -107,11 +114,7 @@ def _upload_manifest(manifest_path: Path) -> Optional[str]:
             logger.warning("Storacha upload failed (rc=%s): %s", result.returncode, output[:400])
             return None
 
-        import re
-
-        cid_match = re.search(r"storacha\.link/ipfs/([a-zA-Z0-9]+)", output)
-        if not cid_match:
-            cid_match = re.search(r"(bafy[a-zA-Z0-9]+)", output)
+        cid_match = STORACHA_LINK_CID_RE.search(output) or BARE_CID_RE.search(output)
         if cid_match:
             cid = cid_match.group(1)
             logger.info("Uploaded manifest to Storacha: cid=%s", cid)
@@ -158,10 +161,19 @@ def schedule_manifest_refresh(source: str = "unknown") -> None:
         return
 
     if STORACHA_ASYNC:
-        try:
-            _executor.submit(refresh_manifest, source)
-        except Exception as exc:  # pragma: no cover
-            logger.debug("Manifest refresh scheduling failed: %s", exc)
+        global _pending_refresh
+        with _pending_lock:
+            # A queued refresh has not read the database yet, so it will pick
+            # up this change too; skip a second generate + CLI upload
+            if _pending_refresh is not None and not (
+                _pending_refresh.running() or _pending_refresh.done()
+            ):
+                logger.debug("Manifest refresh already queued; coalescing %s", source)
+                return
+            try:
+                _pending_refresh = _executor.submit(refresh_manifest, source)
+            except Exception as exc:  # pragma: no cover
+                logger.debug("Manifest refresh scheduling failed: %s", exc)
     else:
         refresh_manifest(source)
 
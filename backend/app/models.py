@@ -2,7 +2,7 @@
 SQLAlchemy database models for proposals and votes.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -28,6 +28,15 @@ class Proposal(Base):
     tx_hash = Column(String, nullable=True, index=True)  # Blockchain transaction hash
     on_chain_id = Column(Integer, nullable=True, index=True)  # ID on the smart contract
     
+    # Partial index covering only active proposals (polled by the voting agent)
+    __table_args__ = (
+        Index(
+            'ix_proposals_status_active', 'id',
+            sqlite_where=text("status = 'active'"),
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
+    
     def __repr__(self):
         return f"<Proposal(id={self.id}, title='{self.title}', status='{self.status}')>"
 
@@ -6,7 +6,6 @@ Responsibilities:
 - Timeout and optional async execution
 - Structured logging + lightweight metrics hooks
 """
-import copy
 import logging
 import os
 import time
@@ -67,7 +66,10 @@ def run_research_pipeline(proposal: Dict[str, Any], source: str = "unknown") ->
         )
         return proposal
 
-    payload = copy.deepcopy(proposal)
+    # process_proposal copies what it mutates and never touches its input, so
+    # a shallow snapshot is enough; deep-copying re-walked any analysis
+    # attached by an earlier run on every retry
+    payload = dict(proposal)
     start_time = time.perf_counter()
 
     def _invoke():
@@ -3,8 +3,11 @@ Shared vote handling utilities for API endpoints and simulated agents.
 """
 
 import logging
-from typing import Optional
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
 from fastapi import HTTPException
+from sqlalchemy import bindparam, insert, update
 from sqlalchemy.orm import Session
 
 from .models import Proposal as DBProposal, Vote as DBVote
@@ -22,6 +25,29 @@ def _get_neo_client() -> NeoClient:
     return _neo_client
 
 
+def _increment_tallies(db: Session, increments: Dict[int, List[int]]) -> None:
+    """
+    Add ``{proposal_id: [yes_inc, no_inc]}`` to the vote counters in SQL.
+
+    Incrementing in the database (rather than read-modify-write on ORM
+    attributes) keeps tallies correct when the API and the simulation agent
+    write to the same proposal concurrently.
+    """
+    proposals = DBProposal.__table__
+    db.execute(
+        update(proposals)
+        .where(proposals.c.id == bindparam("pid"))
+        .values(
+            yes_votes=proposals.c.yes_votes + bindparam("yes_inc"),
+            no_votes=proposals.c.no_votes + bindparam("no_inc"),
+        ),
+        [
+            {"pid": proposal_id, "yes_inc": yes_inc, "no_inc": no_inc}
+            for proposal_id, (yes_inc, no_inc) in increments.items()
+        ],
+    )
+
+
 def process_vote(db: Session, proposal: DBProposal, voter_address: str, vote_value: int) -> dict:
     """
     Persist a vote for a proposal and submit it to the blockchain (or simulation).
@@ -84,12 +110,10 @@ def process_vote(db: Session, proposal: DBProposal, voter_address: str, vote_val
     db.add(db_vote)
 
     # Update tally
-    if vote_value == 1:
-        proposal.yes_votes += 1
-    else:
-        proposal.no_votes += 1
+    _increment_tallies(db, {proposal.id: [1, 0] if vote_value == 1 else [0, 1]})
 
     db.commit()
+    db.refresh(proposal)
 
     logger.info(
         "Vote recorded",
@@ -108,3 +132,77 @@ def process_vote(db: Session, proposal: DBProposal, voter_address: str, vote_val
         "no_votes": proposal.no_votes
     }
 
+
+def record_votes(db: Session, votes: List[dict]) -> List[dict]:
+    """
+    Persist a batch of votes with one INSERT and one counter UPDATE.
+
+    Intended for trusted, generated voters (e.g. the simulation agent) whose
+    addresses are unique by construction, so the on-chain ``has_voted`` guard
+    used by ``process_vote`` is skipped. Each vote dict needs ``proposal_id``,
+    ``voter_address`` and ``vote``; ``on_chain_id`` is optional. Votes already
+    present in the database, votes on proposals that are no longer active or
+    past their deadline, and votes the chain rejects are dropped. Returns the
+    recorded votes with their ``tx_hash`` filled in.
+    """
+    if not votes:
+        return []
+
+    # Votes wait in the agent's queue, so the proposal may have been finalized
+    # or expired since the agent's snapshot
+    now = time.time()
+    open_ids = {
+        row.id
+        for row in db.query(DBProposal.id, DBProposal.deadline).filter(
+            DBProposal.id.in_({v["proposal_id"] for v in votes}),
+            DBProposal.status == "active",
+        )
+        if not (row.deadline and now > row.deadline)
+    }
+
+    existing = set(
+        db.query(DBVote.proposal_id, DBVote.voter_address).filter(
+            DBVote.voter_address.in_([v["voter_address"] for v in votes])
+        ).all()
+    )
+
+    neo_client = _get_neo_client()
+    rows = []
+    increments: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    for vote in votes:
+        key = (vote["proposal_id"], vote["voter_address"])
+        if key in existing or vote["proposal_id"] not in open_ids:
+            continue
+
+        # One failed submission must not drop the batch's already-sent votes
+        try:
+            tx_result = neo_client.vote(
+                proposal_id=vote.get("on_chain_id") or vote["proposal_id"],
+                voter=vote["voter_address"],
+                choice=vote["vote"]
+            )
+        except Exception as exc:
+            logger.warning(
+                "Skipping vote that failed on-chain submission: %s",
+                exc,
+                extra={"proposal_id": vote["proposal_id"], "voter": vote["voter_address"]},
+            )
+            continue
+        existing.add(key)
+        rows.append({
+            "proposal_id": vote["proposal_id"],
+            "voter_address": vote["voter_address"],
+            "vote": vote["vote"],
+            "tx_hash": tx_result.get("tx_hash"),
+        })
+        increments[vote["proposal_id"]][0 if vote["vote"] == 1 else 1] += 1
+
+    if not rows:
+        return []
+
+    db.execute(insert(DBVote.__table__), rows)
+    _increment_tallies(db, increments)
+    db.commit()
+
+    logger.info("Recorded %s votes across %s proposals", len(rows), len(increments))
+    return rows
@@ -2,27 +2,61 @@
 Background agent that simulates real-time voting on proposals.
 
 Designed to integrate with the existing agentic stack by reusing the shared
-`process_vote` logic and database/Neo client paths. Emits one vote per
+vote service and database/Neo client paths. Emits one vote per
 proposal every `interval_seconds`, capped per proposal to avoid unbounded
 growth in demo scenarios.
 """
 
+import asyncio
+import heapq
 import logging
-import random
+import queue
 import threading
 import time
 from collections import defaultdict
-from typing import Callable, Dict, Optional
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from fastapi import HTTPException
+import numpy as np
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import Session
 
-from .db import SessionLocal
+from .db import AgentSessionLocal
 from .models import Proposal as DBProposal
-from .vote_service import process_vote
+from .vote_service import record_votes
 
 logger = logging.getLogger(__name__)
 
+# Number of uniform samples drawn per refill of the agent's RNG buffer
+RANDOM_BUFFER_SIZE = 4096
+
+# Set whenever this process creates, deletes or changes the status of a
+# proposal, so an idle agent knows the active set is worth re-reading
+_proposals_changed = threading.Event()
+
+
+@event.listens_for(DBProposal, "after_insert")
+@event.listens_for(DBProposal, "after_delete")
+def _on_proposal_added_or_removed(mapper, connection, target) -> None:
+    _proposals_changed.set()
+
+
+@event.listens_for(DBProposal, "after_update")
+def _on_proposal_updated(mapper, connection, target) -> None:
+    if inspect(target).attrs.status.history.has_changes():
+        _proposals_changed.set()
+
+
+@dataclass
+class ActiveProposal:
+    """Lightweight snapshot of the proposal columns the agent reads."""
+    id: int
+    confidence: Optional[int]
+    deadline: Optional[int]
+    yes_votes: int
+    no_votes: int
+    on_chain_id: Optional[int]
+
 
 class SimulatedVotingAgent:
     """
@@ -32,6 +66,18 @@ class SimulatedVotingAgent:
     - Stops voting once `max_votes_per_proposal` is reached
     - Biases toward "yes" using a configurable probability blended with the
       proposal's confidence score for more realistic behavior
+    - Keeps a min-heap of `(next_due_ts, proposal_id)` so the loop sleeps
+      until the next vote is due instead of polling every proposal; the set
+      of active proposals is cached and re-read every `refresh_seconds`
+    - Decouples deciding from writing: the scheduler only reads its cached
+      snapshot and enqueues votes, while a single writer thread drains up to
+      `write_batch_size` votes per batched INSERT/UPDATE
+    - The scheduler is a coroutine: started from async code (FastAPI startup)
+      it runs as a task on that event loop, with snapshot refreshes offloaded
+      via `asyncio.to_thread`; from sync code it gets a private loop thread
+    - While no proposal is active, skips the refresh query unless a proposal
+      change was observed in-process or `idle_refresh_seconds` have passed
+      (covers proposals created by other processes)
     """
 
     def __init__(
@@ -40,115 +86,276 @@ class SimulatedVotingAgent:
         interval_seconds: float = 2.0,
         max_votes_per_proposal: int = 200,
         yes_probability: float = 0.65,
+        refresh_seconds: float = 5.0,
+        write_batch_size: int = 100,
+        idle_refresh_seconds: float = 60.0,
         db_factory: Optional[Callable[[], Session]] = None,
     ) -> None:
         self.interval_seconds = max(interval_seconds, 0.5)
         self.max_votes_per_proposal = max(max_votes_per_proposal, 1)
         self.yes_probability = min(max(yes_probability, 0.0), 1.0)
-        self.db_factory = db_factory or SessionLocal
+        self.refresh_seconds = max(refresh_seconds, 0.5)
+        self.write_batch_size = max(write_batch_size, 1)
+        self.idle_refresh_seconds = max(idle_refresh_seconds, self.refresh_seconds)
+        self.db_factory = db_factory or AgentSessionLocal
 
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._vote_queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
         self._last_vote_at: Dict[int, float] = {}
         self._vote_counters: Dict[int, int] = defaultdict(int)
+        self._active_cache: Dict[int, ActiveProposal] = {}
+        self._schedule: List[Tuple[float, int]] = []
+        self._scheduled_ids: Set[int] = set()
+        self._next_refresh_at = 0.0
+        self._next_idle_refresh_at = 0.0
+        self._blended_cache: Dict[int, Tuple[int, float]] = {}
+        self._addr_prefix: Dict[int, str] = {}
+        self._rng = np.random.default_rng()
+        self._rand_buf: List[float] = []
+        self._rand_idx = 0
 
     def start(self) -> None:
         """Start the background voting loop."""
-        if self._thread and self._thread.is_alive():
+        if (self._task and not self._task.done()) or (self._thread and self._thread.is_alive()):
             logger.info("SimulatedVotingAgent already running")
             return
 
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
-        self._thread.start()
-        logger.info("SimulatedVotingAgent thread started")
+        self._wakeup = asyncio.Event()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self._loop = loop
+            self._task = loop.create_task(self._run_loop())
+            logger.info("SimulatedVotingAgent task started")
+        else:
+            self._thread = threading.Thread(
+                target=asyncio.run, args=(self._run_loop(),), daemon=True)
+            self._thread.start()
+            logger.info("SimulatedVotingAgent thread started")
 
     def stop(self) -> None:
         """Stop the background voting loop."""
         self._stop_event.set()
+        if self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # loop already closed
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=2.0)
+        # Sentinel lets the writer flush whatever is still queued, then exit
+        self._vote_queue.put(None)
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._writer_thread.join(timeout=2.0)
         logger.info("SimulatedVotingAgent stopped")
 
-    def _run_loop(self) -> None:
-        """Main loop that periodically checks and casts votes."""
+    async def _run_loop(self) -> None:
+        """Main loop that sleeps until the next scheduled vote is due."""
+        self._loop = asyncio.get_running_loop()
         while not self._stop_event.is_set():
             try:
-                self._tick()
+                timeout = await self._tick()
             except Exception as exc:  # pragma: no cover - defensive logging
                 logger.error(f"SimulatedVotingAgent tick failed: {exc}")
-            time.sleep(0.5)
+                timeout = self.refresh_seconds
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
 
-    def _tick(self) -> None:
-        """Process one iteration across all active proposals."""
+    def _load_active(self) -> Dict[int, ActiveProposal]:
+        """Read the active-proposal snapshot (blocking; runs off the event loop)."""
         db = self.db_factory()
+        try:
+            rows = db.execute(
+                select(
+                    DBProposal.id,
+                    DBProposal.confidence,
+                    DBProposal.deadline,
+                    DBProposal.yes_votes,
+                    DBProposal.no_votes,
+                    DBProposal.on_chain_id,
+                ).where(DBProposal.status == "active")
+            ).all()
+        finally:
+            db.close()
+        return {
+            row.id: ActiveProposal(
+                id=row.id,
+                confidence=row.confidence,
+                deadline=row.deadline,
+                yes_votes=row.yes_votes or 0,
+                no_votes=row.no_votes or 0,
+                on_chain_id=row.on_chain_id,
+            )
+            for row in rows
+        }
+
+    def _refresh_schedule(self, active: Dict[int, ActiveProposal], now: float) -> None:
+        """Swap in a new active-proposal snapshot and schedule newcomers."""
+        self._active_cache = active
+        for proposal_id in self._active_cache:
+            if proposal_id in self._scheduled_ids:
+                continue
+            last = self._last_vote_at.get(proposal_id, 0.0)
+            heapq.heappush(self._schedule, (max(last + self.interval_seconds, now), proposal_id))
+            self._scheduled_ids.add(proposal_id)
+        self._next_refresh_at = now + self.refresh_seconds
+
+    def _unschedule(self, proposal_id: int) -> None:
+        """Drop a proposal that is no longer eligible; a refresh may re-add it."""
+        self._scheduled_ids.discard(proposal_id)
+        self._blended_cache.pop(proposal_id, None)
+        self._addr_prefix.pop(proposal_id, None)
+
+    async def _tick(self) -> float:
+        """
+        Enqueue a vote for every proposal whose slot is due.
+
+        Only touches the database when the active-proposal snapshot is due
+        for a refresh. Returns the number of seconds until the next
+        scheduled event.
+        """
         now = time.time()
 
-        try:
-            active = db.query(DBProposal).filter(DBProposal.status == "active").all()
-            for proposal in active:
-                current_votes = proposal.yes_votes + proposal.no_votes
-                if current_votes >= self.max_votes_per_proposal:
-                    continue
+        if now >= self._next_refresh_at:
+            if (
+                self._active_cache
+                or _proposals_changed.is_set()
+                or now >= self._next_idle_refresh_at
+            ):
+                _proposals_changed.clear()
+                active = await asyncio.to_thread(self._load_active)
+                self._refresh_schedule(active, now)
+                self._next_idle_refresh_at = now + self.idle_refresh_seconds
+            else:
+                # Nothing active and nothing changed: skip the session entirely
+                self._next_refresh_at = now + self.refresh_seconds
+
+        while self._schedule and self._schedule[0][0] <= now:
+            _, proposal_id = heapq.heappop(self._schedule)
+            proposal = self._active_cache.get(proposal_id)
+            if proposal is None:
+                self._unschedule(proposal_id)
+                continue
+
+            current_votes = proposal.yes_votes + proposal.no_votes
+            if current_votes >= self.max_votes_per_proposal:
+                self._unschedule(proposal_id)
+                continue
+
+            if proposal.deadline and now > proposal.deadline:
+                self._unschedule(proposal_id)
+                continue
+
+            heapq.heappush(self._schedule, (now + self.interval_seconds, proposal_id))
+
+            vote_value = self._decide_vote(proposal)
+            self._vote_queue.put({
+                "proposal_id": proposal.id,
+                "on_chain_id": proposal.on_chain_id,
+                "voter_address": self._generate_voter_address(proposal.id, current_votes),
+                "vote": vote_value,
+            })
 
-                if proposal.deadline and now > proposal.deadline:
-                    continue
+            # Optimistically advance the snapshot; the next refresh reloads
+            # authoritative tallies from the database
+            if vote_value == 1:
+                proposal.yes_votes += 1
+            else:
+                proposal.no_votes += 1
+            self._last_vote_at[proposal_id] = now
+            self._vote_counters[proposal_id] += 1
 
-                last = self._last_vote_at.get(proposal.id, 0.0)
-                if now - last < self.interval_seconds:
-                    continue
+        next_event = self._next_refresh_at
+        if self._schedule:
+            next_event = min(next_event, self._schedule[0][0])
+        return max(next_event - time.time(), 0.0)
 
-                vote_value = self._decide_vote(proposal)
-                voter_address = self._generate_voter_address(proposal.id, current_votes)
+    def _writer_loop(self) -> None:
+        """Single DB writer: drain queued votes and persist them in batches."""
+        running = True
+        while running:
+            item = self._vote_queue.get()
+            if item is None:
+                break
 
+            batch = [item]
+            while len(batch) < self.write_batch_size:
                 try:
-                    process_vote(
-                        db=db,
-                        proposal=proposal,
-                        voter_address=voter_address,
-                        vote_value=vote_value,
-                    )
-                    self._last_vote_at[proposal.id] = now
-                    self._vote_counters[proposal.id] += 1
-                    logger.debug(
-                        "Simulated vote cast",
-                        extra={
-                            "proposal_id": proposal.id,
-                            "voter": voter_address,
-                            "vote": vote_value,
-                        },
-                    )
-                except HTTPException as exc:
-                    # Duplicate vote attempts are expected when concurrency overlaps
-                    if exc.status_code != 400:
-                        logger.warning(
-                            "Simulated vote rejected",
-                            extra={
-                                "proposal_id": proposal.id,
-                                "voter": voter_address,
-                                "detail": exc.detail,
-                            },
-                        )
-                except Exception as exc:
-                    logger.error(
-                        "Simulated vote failed",
-                        extra={
-                            "proposal_id": proposal.id,
-                            "voter": voter_address,
-                            "error": str(exc),
-                        },
-                    )
+                    item = self._vote_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            self._write_votes(batch)
+
+    def _write_votes(self, pending: List[dict]) -> None:
+        """Persist a batch of queued votes in one transaction."""
+        db = self.db_factory()
+        try:
+            recorded = record_votes(db, pending)
+        except Exception as exc:
+            db.rollback()
+            logger.error(
+                "Simulated vote batch failed",
+                extra={"votes": len(pending), "error": str(exc)},
+            )
+            return
         finally:
             db.close()
 
-    def _decide_vote(self, proposal: DBProposal) -> int:
+        for vote in recorded:
+            logger.debug(
+                "Simulated vote cast",
+                extra={
+                    "proposal_id": vote["proposal_id"],
+                    "voter": vote["voter_address"],
+                    "vote": vote["vote"],
+                },
+            )
+
+    def _decide_vote(self, proposal: ActiveProposal) -> int:
         """Blend configured bias with proposal confidence for realism."""
+        return 1 if self._next_random() < self._blended_yes_probability(proposal) else 0
+
+    def _blended_yes_probability(self, proposal: ActiveProposal) -> float:
+        """Return the yes-probability for a proposal, cached per confidence value."""
         confidence = proposal.confidence or 50
+        cached = self._blended_cache.get(proposal.id)
+        if cached is not None and cached[0] == confidence:
+            return cached[1]
+
         confidence_weight = min(max(confidence / 100, 0.0), 1.0)
         blended_yes_probability = min(
             max((self.yes_probability + confidence_weight) / 2, 0.05), 0.95
         )
-        return 1 if random.random() < blended_yes_probability else 0
+        self._blended_cache[proposal.id] = (confidence, blended_yes_probability)
+        return blended_yes_probability
+
+    def _next_random(self) -> float:
+        """Return the next uniform sample, refilling the buffer in bulk."""
+        if self._rand_idx >= len(self._rand_buf):
+            self._rand_buf = self._rng.random(RANDOM_BUFFER_SIZE).tolist()
+            self._rand_idx = 0
+        value = self._rand_buf[self._rand_idx]
+        self._rand_idx += 1
+        return value
 
     def _generate_voter_address(self, proposal_id: int, current_votes: int) -> str:
         """
@@ -156,5 +363,8 @@ class SimulatedVotingAgent:
         duplicate-vote conflicts while keeping them recognizable in logs.
         """
         next_index = max(self._vote_counters[proposal_id], current_votes) + 1
-        return f"sim-voter-{proposal_id}-{next_index:05d}"
+        prefix = self._addr_prefix.get(proposal_id)
+        if prefix is None:
+            prefix = self._addr_prefix[proposal_id] = f"sim-voter-{proposal_id}-"
+        return "%s%05d" % (prefix, next_index)
 
@@ -16,13 +16,14 @@ Examples:
     python clean_db.py --mode hard        # Drop and recreate tables
     python clean_db.py --mode nuclear     # Delete database file
     python clean_db.py --mode soft --confirm  # Skip confirmation
+    SMARTBOARD_ASSUME_YES=1 python clean_db.py --mode soft  # Same, for pipelines
 """
 
 import os
 import sys
 import argparse
 from pathlib import Path
-from sqlalchemy import text
+from sqlalchemy import delete, text
 from dotenv import load_dotenv
 
 # Add parent directory to path to import backend modules
@@ -39,6 +40,11 @@ from backend.app.db import engine, SessionLocal
 from backend.app.models import Base, Proposal, Vote
 
 
+def _auto_confirm() -> bool:
+    """Whether confirmation prompts are pre-approved via the environment."""
+    return os.getenv("SMARTBOARD_ASSUME_YES") == "1"
+
+
 def get_db_path():
     """Get the database file path."""
     database_url = os.getenv("DATABASE_URL", "sqlite:///./proposals.db")
@@ -69,13 +75,12 @@ def soft_clean():
     print("🗑️  Soft clean: Deleting all records from tables...")
     db = SessionLocal()
     try:
-        # Delete votes first (foreign key constraint)
-        vote_count = db.query(Vote).count()
-        db.query(Vote).delete()
+        # Delete votes first (foreign key constraint); rowcount reports how
+        # many rows went, so no separate COUNT(*) scan is needed
+        vote_count = db.execute(delete(Vote)).rowcount
         
         # Delete proposals
-        proposal_count = db.query(Proposal).count()
-        db.query(Proposal).delete()
+        proposal_count = db.execute(delete(Proposal)).rowcount
         
         db.commit()
         print(f"✅ Deleted {proposal_count} proposals and {vote_count} votes")
@@ -139,12 +144,19 @@ def main():
         help="Cleaning mode: soft (delete records), hard (drop/recreate tables), nuclear (delete file)"
     )
     parser.add_argument(
-        "--confirm",
+        "--confirm", "--yes", "-y",
+        dest="confirm",
         action="store_true",
-        help="Skip confirmation prompt"
+        help="Skip confirmation prompt (also SMARTBOARD_ASSUME_YES=1)"
     )
     
     args = parser.parse_args()
+    if _auto_confirm():
+        args.confirm = True
+    
+    # Never block on input() when running unattended
+    if args.confirm and not args.mode:
+        parser.error("--mode is required when confirmation is skipped")
     
     # Show current database state
     try:
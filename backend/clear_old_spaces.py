@@ -6,18 +6,24 @@ Usage:
     python backend/clear_old_spaces.py                    # List all spaces
     python backend/clear_old_spaces.py --delete <space>   # Delete proposals from a space
     python backend/clear_old_spaces.py --delete-all-old    # Delete all proposals from non-current spaces
+
+Set SMARTBOARD_ASSUME_YES=1 (or pass --yes) to skip confirmation prompts in
+automated pipelines.
 """
 
 import os
 import sys
 import argparse
 from pathlib import Path
+from typing import Optional
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from dotenv import load_dotenv
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
 from backend.app.db import SessionLocal
 from backend.app.models import Proposal
 from backend.app.utils import get_current_storacha_space
@@ -29,132 +35,142 @@ if env_path.exists():
 else:
     load_dotenv()
 
+# SQL expression for the space tag stored in proposal metadata
+SPACE_COLUMN = Proposal.proposal_metadata["storacha_space"].as_string()
 
-def list_spaces():
-    """List all Storacha spaces that have proposals."""
-    db = SessionLocal()
-    try:
-        all_proposals = db.query(Proposal).all()
-        spaces = {}
-        no_space_count = 0
-        
-        for proposal in all_proposals:
-            meta = proposal.proposal_metadata or {}
-            space = meta.get("storacha_space")
-            if space:
-                spaces[space] = spaces.get(space, 0) + 1
-            else:
-                no_space_count += 1
-        
-        current_space = get_current_storacha_space()
-        
-        print("\n" + "=" * 60)
-        print("STORACHA SPACES WITH PROPOSALS")
-        print("=" * 60)
-        print(f"\nCurrent active space: {current_space or 'NOT SET'}")
-        print(f"\nTotal proposals in database: {len(all_proposals)}")
-        print(f"\nProposals by space:")
-        
-        if spaces:
-            for space, count in sorted(spaces.items()):
-                marker = " ← CURRENT" if space == current_space else ""
-                print(f"  • {space}: {count} proposals{marker}")
+
+def _auto_confirm() -> bool:
+    """Whether confirmation prompts are pre-approved via the environment."""
+    return os.getenv("SMARTBOARD_ASSUME_YES") == "1"
+
+
+def list_spaces(db: Optional[Session] = None):
+    """
+    List all Storacha spaces that have proposals.
+    
+    Uses the caller's session when one is given, otherwise opens its own.
+    """
+    if db is None:
+        with SessionLocal() as db:
+            return list_spaces(db)
+    
+    # Aggregate in the database; only one row per space comes back
+    rows = db.execute(
+        select(SPACE_COLUMN, func.count()).group_by(SPACE_COLUMN)
+    ).all()
+    spaces = {}
+    no_space_count = 0
+    
+    for space, count in rows:
+        if space:
+            spaces[space] = count
         else:
-            print("  (No proposals with space tags)")
-        
-        if no_space_count > 0:
-            print(f"\n  • (no space tag): {no_space_count} proposals (legacy)")
-        
-        print("\n" + "=" * 60)
-        
-        return spaces, current_space, no_space_count
-        
-    finally:
-        db.close()
+            no_space_count += count
+    total_count = sum(spaces.values()) + no_space_count
+    
+    current_space = get_current_storacha_space()
+    
+    print("\n" + "=" * 60)
+    print("STORACHA SPACES WITH PROPOSALS")
+    print("=" * 60)
+    print(f"\nCurrent active space: {current_space or 'NOT SET'}")
+    print(f"\nTotal proposals in database: {total_count}")
+    print(f"\nProposals by space:")
+    
+    if spaces:
+        for space, count in sorted(spaces.items()):
+            marker = " ← CURRENT" if space == current_space else ""
+            print(f"  • {space}: {count} proposals{marker}")
+    else:
+        print("  (No proposals with space tags)")
+    
+    if no_space_count > 0:
+        print(f"\n  • (no space tag): {no_space_count} proposals (legacy)")
+    
+    print("\n" + "=" * 60)
+    
+    return spaces, current_space, no_space_count
 
 
 def delete_space_proposals(space_name: str, confirm: bool = True):
     """Delete all proposals from a specific space."""
-    db = SessionLocal()
-    try:
-        current_space = get_current_storacha_space()
-        
-        if space_name == current_space:
-            print(f"\n❌ ERROR: Cannot delete proposals from current active space: {space_name}")
-            print(f"   Switch to a different space first: storacha space use <other-space>")
+    with SessionLocal() as db:
+        try:
+            current_space = get_current_storacha_space()
+            
+            if space_name == current_space:
+                print(f"\n❌ ERROR: Cannot delete proposals from current active space: {space_name}")
+                print(f"   Switch to a different space first: storacha space use <other-space>")
+                return False
+            
+            # Count proposals from the specified space
+            count = db.execute(
+                select(func.count()).where(SPACE_COLUMN == space_name)
+            ).scalar_one()
+            if count == 0:
+                print(f"\n✓ No proposals found for space: {space_name}")
+                return True
+            
+            if confirm:
+                print(f"\n⚠️  WARNING: This will permanently delete {count} proposals from space: {space_name}")
+                response = input("   Are you sure? Type 'yes' to confirm: ")
+                if response.lower() != 'yes':
+                    print("   Cancelled.")
+                    return False
+            
+            # Delete proposals
+            db.execute(delete(Proposal).where(SPACE_COLUMN == space_name))
+            db.commit()
+            
+            print(f"\n✓ Successfully deleted {count} proposals from space: {space_name}")
+            return True
+            
+        except Exception as e:
+            db.rollback()
+            print(f"\n❌ ERROR: Failed to delete proposals: {e}")
             return False
+
+
+def delete_all_old_spaces(confirm: bool = True):
+    """Delete proposals from all spaces except the current one."""
+    # One session and one transaction for both the listing and the delete
+    with SessionLocal() as db:
+        spaces, current_space, no_space_count = list_spaces(db)
         
-        # Find proposals from the specified space
-        all_proposals = db.query(Proposal).all()
-        to_delete = []
-        for proposal in all_proposals:
-            meta = proposal.proposal_metadata or {}
-            if meta.get("storacha_space") == space_name:
-                to_delete.append(proposal)
+        if not spaces:
+            print("\n✓ No spaces with proposals found.")
+            return True
         
-        count = len(to_delete)
-        if count == 0:
-            print(f"\n✓ No proposals found for space: {space_name}")
+        old_spaces = [s for s in spaces.keys() if s != current_space]
+        
+        if not old_spaces:
+            print(f"\n✓ No old spaces found. All proposals are in current space: {current_space}")
             return True
         
+        total_to_delete = sum(spaces[s] for s in old_spaces)
+        
         if confirm:
-            print(f"\n⚠️  WARNING: This will permanently delete {count} proposals from space: {space_name}")
+            print(f"\n⚠️  WARNING: This will permanently delete proposals from {len(old_spaces)} old space(s):")
+            for space in old_spaces:
+                print(f"   • {space}: {spaces[space]} proposals")
+            print(f"\n   Total: {total_to_delete} proposals will be deleted")
             response = input("   Are you sure? Type 'yes' to confirm: ")
             if response.lower() != 'yes':
                 print("   Cancelled.")
                 return False
         
-        # Delete proposals
-        for proposal in to_delete:
-            db.delete(proposal)
-        db.commit()
-        
-        print(f"\n✓ Successfully deleted {count} proposals from space: {space_name}")
-        return True
-        
-    except Exception as e:
-        db.rollback()
-        print(f"\n❌ ERROR: Failed to delete proposals: {e}")
-        return False
-    finally:
-        db.close()
-
-
-def delete_all_old_spaces(confirm: bool = True):
-    """Delete proposals from all spaces except the current one."""
-    spaces, current_space, no_space_count = list_spaces()
-    
-    if not spaces:
-        print("\n✓ No spaces with proposals found.")
-        return True
-    
-    old_spaces = [s for s in spaces.keys() if s != current_space]
-    
-    if not old_spaces:
-        print(f"\n✓ No old spaces found. All proposals are in current space: {current_space}")
-        return True
-    
-    total_to_delete = sum(spaces[s] for s in old_spaces)
-    
-    if confirm:
-        print(f"\n⚠️  WARNING: This will permanently delete proposals from {len(old_spaces)} old space(s):")
-        for space in old_spaces:
-            print(f"   • {space}: {spaces[space]} proposals")
-        print(f"\n   Total: {total_to_delete} proposals will be deleted")
-        response = input("   Are you sure? Type 'yes' to confirm: ")
-        if response.lower() != 'yes':
-            print("   Cancelled.")
+        try:
+            result = db.execute(
+                delete(Proposal).where(SPACE_COLUMN.in_(old_spaces))
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"\n❌ ERROR: Failed to delete proposals: {e}")
             return False
     
-    success = True
-    for space in old_spaces:
-        if not delete_space_proposals(space, confirm=False):
-            success = False
-    
-    if success:
-        print(f"\n✓ Successfully deleted all proposals from old spaces")
-    
-    return success
+    print(f"\n✓ Successfully deleted {result.rowcount} proposals from old spaces")
+    return True
 
 
 def delete_legacy_proposals(confirm: bool = True):
@@ -226,12 +242,15 @@ Examples:
         help="Delete all legacy proposals (those without space tags)"
     )
     parser.add_argument(
-        "--no-confirm",
+        "--no-confirm", "--yes", "-y",
+        dest="no_confirm",
         action="store_true",
-        help="Skip confirmation prompts (use with caution!)"
+        help="Skip confirmation prompts (use with caution!); also SMARTBOARD_ASSUME_YES=1"
     )
     
     args = parser.parse_args()
+    if _auto_confirm():
+        args.no_confirm = True
     
     if args.delete:
         delete_space_proposals(args.delete, confirm=not args.no_confirm)
@@ -7,7 +7,7 @@ with their metadata, which can then be uploaded to Storacha and used
 for syncing proposals across different instances.
 
 Usage:
-    python create_manifest.py [--output manifest.json] [--upload]
+    python create_manifest.py [--output manifest.json] [--upload] [--no-save]
     
 Examples:
     # Create manifest from database
@@ -18,37 +18,48 @@ Examples:
     
     # Custom output file
     python create_manifest.py --output my_manifest.json
+    
+    # Upload without keeping a local copy (staged in RAM when possible)
+    python create_manifest.py --upload --no-save
 """
 
 import argparse
 import json
+import os
 import sys
+import tempfile
 from pathlib import Path
-from datetime import datetime
+from typing import BinaryIO, Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.app.db import SessionLocal
 from backend.app.models import Proposal
+from spoon_agent.storacha_cid import BARE_CID_RE, STORACHA_LINK_CID_RE
 
 
-def create_manifest(output_path: str = "manifest.json") -> str:
+def write_manifest(f: BinaryIO) -> int:
     """
-    Create a manifest.json file from all proposals in the database.
+    Stream all proposals as a JSON array into a binary file handle.
+    
+    Entries are serialized one at a time so memory stays flat regardless of
+    how many proposals exist. The output matches json.dump(manifest, f,
+    indent=2), the format manifest_manager also writes.
     
     Args:
-        output_path: Path to output manifest file
+        f: File object opened in binary write mode
         
     Returns:
-        Path to created manifest file
+        Number of proposals written
     """
     db = SessionLocal()
     try:
-        proposals = db.query(Proposal).order_by(Proposal.created_at.desc()).all()
+        query = db.query(Proposal).order_by(Proposal.created_at.desc()).yield_per(1000)
         
-        manifest = []
-        for proposal in proposals:
+        count = 0
+        f.write(b"[")
+        for proposal in query:
             manifest_entry = {
                 "cid": proposal.ipfs_cid,
                 "title": proposal.title,
@@ -60,21 +71,67 @@ def create_manifest(output_path: str = "manifest.json") -> str:
                 "yes_votes": proposal.yes_votes,
                 "no_votes": proposal.no_votes
             }
-            manifest.append(manifest_entry)
-        
-        # Write manifest
-        output_file = Path(output_path)
-        with open(output_file, 'w') as f:
-            json.dump(manifest, f, indent=2)
-        
-        print(f"✅ Created manifest with {len(manifest)} proposals")
-        print(f"   Output: {output_file.absolute()}")
-        
-        return str(output_file.absolute())
+            # Dump as a one-element list and strip the brackets so the entry
+            # carries the same indentation it has inside the full array
+            f.write(b",\n" if count else b"\n")
+            f.write(json.dumps([manifest_entry], indent=2)[2:-2].encode("utf-8"))
+            count += 1
+        f.write(b"\n]" if count else b"]")
+        return count
     finally:
         db.close()
 
 
+def create_manifest(output_path: str = "manifest.json") -> str:
+    """
+    Create a manifest.json file from all proposals in the database.
+    
+    Args:
+        output_path: Path to output manifest file
+        
+    Returns:
+        Path to created manifest file
+    """
+    output_file = Path(output_path)
+    with open(output_file, 'wb') as f:
+        count = write_manifest(f)
+    
+    print(f"✅ Created manifest with {count} proposals")
+    print(f"   Output: {output_file.absolute()}")
+    
+    return str(output_file.absolute())
+
+
+def _ram_tempdir() -> Optional[str]:
+    """Return a RAM-backed temp directory (Linux /dev/shm) if one is usable."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+def upload_manifest_from_db() -> str:
+    """
+    Generate the manifest and upload it without keeping a local copy.
+    
+    The Storacha CLI only uploads from paths (no stdin mode), so the manifest
+    is staged in a RAM-backed temp file when available to avoid a disk
+    round-trip before the CLI reads it back.
+    
+    Returns:
+        IPFS CID of uploaded manifest
+    """
+    tmp = tempfile.NamedTemporaryFile(
+        delete=False, suffix=".json", prefix="manifest-", dir=_ram_tempdir())
+    try:
+        with tmp:
+            count = write_manifest(tmp)
+        print(f"✅ Generated manifest with {count} proposals")
+        return upload_manifest(tmp.name)
+    finally:
+        os.unlink(tmp.name)
+
+
 def upload_manifest(manifest_path: str) -> str:
     """
     Upload manifest file to Storacha and return CID.
@@ -87,8 +144,6 @@ def upload_manifest(manifest_path: str) -> str:
     """
     import subprocess
     import shutil
-    import os
-    import re
     
     storacha_cmd = os.getenv("STORACHA_CLI", "storacha")
     if not shutil.which(storacha_cmd):
@@ -107,9 +162,7 @@ def upload_manifest(manifest_path: str) -> str:
         sys.exit(1)
     
     output = f"{result.stdout}\n{result.stderr}"
-    cid_match = re.search(r"storacha\.link/ipfs/([a-zA-Z0-9]+)", output)
-    if not cid_match:
-        cid_match = re.search(r"(bafy[a-zA-Z0-9]+)", output)
+    cid_match = STORACHA_LINK_CID_RE.search(output) or BARE_CID_RE.search(output)
     
     if cid_match:
         cid = cid_match.group(1)
@@ -137,15 +190,23 @@ def main():
         action="store_true",
         help="Upload manifest to Storacha after creation"
     )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="With --upload, skip writing --output and upload from a temp file"
+    )
     
     args = parser.parse_args()
     
-    # Create manifest
-    manifest_path = create_manifest(args.output)
+    if args.upload and args.no_save:
+        cid = upload_manifest_from_db()
+    else:
+        # Create manifest
+        manifest_path = create_manifest(args.output)
+        cid = upload_manifest(manifest_path) if args.upload else None
     
-    # Upload if requested
-    if args.upload:
-        cid = upload_manifest(manifest_path)
+    # Show sync instructions for the uploaded manifest
+    if cid:
         print(f"\n📋 Use this CID to sync proposals:")
         print(f"   POST /sync/storacha/manifest")
         print(f'   {{"manifest_cid": "{cid}", "skip_existing": true}}')
@@ -5,37 +5,178 @@ Can be run directly or imported as a module.
 
 Usage:
     python send_congratulations_email.py <wallet_address> <email>
-    
+    python send_congratulations_email.py --batch [users.csv] [--workers 10]
+
+Batch mode reads "wallet_address,email" lines from the given CSV file (or
+stdin) and sends them over a bounded thread pool. Each worker keeps one SMTP
+connection open and reuses it, so the TLS handshake and login happen once per
+worker instead of once per email.
+
 Or as a module:
     from send_congratulations_email import send_congratulations_email
     send_congratulations_email("N...", "user@example.com")
 """
 
+import argparse
+import csv
+import logging
 import sys
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable, List, Tuple
 
 # Add the parent directory to the path so we can import from app
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.email_service import send_congratulations_email
+from app.email_service import open_smtp_connection, send_congratulations_email
+
+logger = logging.getLogger(__name__)
+
+_worker_state = threading.local()
+_open_connections = []
+_open_connections_lock = threading.Lock()
+
+
+def _worker_connection():
+    """Return this worker's SMTP connection, reconnecting if it went stale."""
+    server = getattr(_worker_state, "server", None)
+    if server is not None:
+        try:
+            if server.noop()[0] == 250:
+                return server
+        except Exception:
+            pass
+        # Stale: forget it so _close_connections doesn't quit() a dead socket
+        with _open_connections_lock:
+            try:
+                _open_connections.remove(server)
+            except ValueError:
+                pass
+        try:
+            server.close()
+        except Exception:
+            pass
+        _worker_state.server = None
+    _worker_state.server = open_smtp_connection()
+    if _worker_state.server is not None:
+        with _open_connections_lock:
+            _open_connections.append(_worker_state.server)
+    return _worker_state.server
+
+
+def _send_one(wallet_address: str, email: str) -> bool:
+    try:
+        server = _worker_connection()
+    except Exception as e:
+        logger.error("Could not connect to SMTP server for %s: %s", email, e)
+        return False
+    return send_congratulations_email(wallet_address, email, server=server)
+
+
+def _close_connections() -> None:
+    with _open_connections_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+    for server in connections:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+
+def read_recipients(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """Parse "wallet_address,email" rows, skipping blanks and a header row."""
+    recipients = []
+    for row in csv.reader(lines):
+        if len(row) < 2 or not row[0].strip():
+            continue
+        wallet_address, email = row[0].strip(), row[1].strip()
+        if wallet_address.lower() == "wallet_address":
+            continue
+        recipients.append((wallet_address, email))
+    return recipients
+
+
+def send_batch(recipients: List[Tuple[str, str]], workers: int = 10) -> int:
+    """
+    Send congratulations emails concurrently.
+
+    Returns:
+        Number of emails sent successfully
+    """
+    workers = max(1, min(workers, len(recipients) or 1))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="congrats-email") as pool:
+            results = list(pool.map(lambda r: _send_one(*r), recipients))
+    finally:
+        # Workers are done, so their connections can be closed from here
+        _close_connections()
+
+    for (wallet_address, email), ok in zip(recipients, results):
+        if ok:
+            logger.info("Sent to %s (%s)", email, wallet_address)
+        else:
+            logger.error("Failed to send to %s (%s)", email, wallet_address)
+    return sum(results)
 
 
 def main():
     """Main function to run the script from command line."""
-    if len(sys.argv) != 3:
-        print("Usage: python send_congratulations_email.py <wallet_address> <email>")
+    parser = argparse.ArgumentParser(
+        description="Send congratulations emails",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python send_congratulations_email.py Nabc123... user@example.com
+  python send_congratulations_email.py --batch users.csv
+  cat users.csv | python send_congratulations_email.py --batch --workers 5
+        """
+    )
+    parser.add_argument("wallet_address", nargs="?", help="User's wallet address")
+    parser.add_argument("email", nargs="?", help="User's email address")
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="CSV",
+        help="Send to every 'wallet_address,email' row in CSV (default: stdin)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=10,
+        help="Concurrent senders in batch mode (default: 10)"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.batch:
+        if args.batch == "-":
+            recipients = read_recipients(sys.stdin)
+        else:
+            with open(args.batch, newline="") as f:
+                recipients = read_recipients(f)
+
+        print(f"Sending congratulations emails to {len(recipients)} recipients...")
+        sent = send_batch(recipients, workers=args.workers)
+        print(f"\nSent {sent}/{len(recipients)} emails")
+        sys.exit(0 if sent == len(recipients) else 1)
+
+    if not args.wallet_address or not args.email:
+        parser.print_usage()
         print("\nExample:")
         print("  python send_congratulations_email.py Nabc123... user@example.com")
         sys.exit(1)
-    
-    wallet_address = sys.argv[1]
-    email = sys.argv[2]
-    
+
+    wallet_address = args.wallet_address
+    email = args.email
+
     print(f"Sending congratulations email to {email} for wallet {wallet_address}...")
-    
+
     success = send_congratulations_email(wallet_address, email)
-    
+
     if success:
         print("✅ Email sent successfully!")
         sys.exit(0)
@@ -46,4 +187,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -4,21 +4,18 @@ Tests for FastAPI backend endpoints.
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from unittest.mock import patch, MagicMock
+from sqlalchemy.pool import StaticPool
+from unittest.mock import Mock, patch
 
-from backend.app.main import app, get_db, get_neo_client
-from backend.app.models import Base
-from backend.app.db import get_db as original_get_db
+from backend.app.main import app, get_db
+from backend.app.models import Base, Proposal
+from backend.app.neo_client import NeoClient
 from backend.app import research_pipeline_adapter as research_adapter
 
-# Create test database
-TEST_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(TEST_DATABASE_URL, connect_args={
-                       "check_same_thread": False})
-TestingSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine)
+# Sessions are bound to the per-worker engine by the _engine fixture
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 
 def override_get_db():
@@ -30,25 +27,122 @@ def override_get_db():
         db.close()
 
 
-# Override the dependency
-app.dependency_overrides[get_db] = override_get_db
-
-# Create test client
-client = TestClient(app)
-
-# Create a mock NEO client for tests
-mock_neo_client = MagicMock()
+@pytest.fixture(scope="session")
+def _engine(request):
+    """
+    In-memory test database for this process, created on first use.
+
+    Named after the pytest-xdist worker so parallel runs (``pytest -n auto``)
+    never share a database; StaticPool keeps the single connection alive so
+    every session in the worker sees the same data.
+    """
+    worker = getattr(request.config, "workerinput", {}).get("workerid", "main")
+    engine = create_engine(
+        f"sqlite:///file:smartboard_test_{worker}?mode=memory&cache=shared&uri=true",
+        connect_args={"check_same_thread": False, "uri": True},
+        poolclass=StaticPool)
+
+    # pysqlite's own transaction handling breaks SAVEPOINTs; let SQLAlchemy
+    # emit BEGIN itself so per-test rollback works
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    TestingSessionLocal.configure(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    yield engine
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def _schema(_engine):
+    """Create the test schema once per test run."""
+    Base.metadata.create_all(bind=_engine)
+    yield
+    Base.metadata.drop_all(bind=_engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    One TestClient for the whole run.
+
+    Deliberately not entered as a context manager: the app's startup hooks
+    would initialise the real database and start background workers.
+    """
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def _neo_spec():
+    """NeoClient-shaped mock, built once per run and reset for each test."""
+    return Mock(spec_set=NeoClient)
+
+
+@pytest.fixture
+def neo_mock(_neo_spec, monkeypatch):
+    """Shared NEO client mock with canned responses, wired into the app."""
+    _neo_spec.reset_mock(return_value=True, side_effect=True)
+    _neo_spec.configure_mock(**{
+        "create_proposal.return_value": {
+            "tx_hash": "0xabcd1234",
+            "proposal_id": 1
+        },
+        "has_voted.return_value": False,
+        "vote.return_value": {"tx_hash": "0xvote5678"},
+        "finalize_proposal.return_value": {"tx_hash": "0xfinalize789"},
+    })
+    monkeypatch.setattr("backend.app.main.get_neo_client", lambda: _neo_spec)
+    monkeypatch.setattr(
+        "backend.app.vote_service._get_neo_client", lambda: _neo_spec)
+    return _neo_spec
 
 
 @pytest.fixture(autouse=True)
-def setup_database():
-    """Setup and teardown test database for each test."""
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
+def db_session(_engine, _schema):
+    """
+    Run each test inside an outer transaction that is rolled back afterwards.
+
+    Sessions handed to the app join it via SAVEPOINTs, so their commits are
+    discarded with the rollback.
+    """
+    connection = _engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(
+        bind=connection, join_transaction_mode="create_savepoint")
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+    TestingSessionLocal.configure(
+        bind=_engine, join_transaction_mode="conservative_savepoint")
+
+
+@pytest.fixture
+def created_proposal(db_session):
+    """An active proposal inserted directly, bypassing /submit-memo."""
+    proposal = Proposal(
+        title="Test Proposal",
+        summary="Summary",
+        ipfs_cid="QmTest",
+        confidence=80,
+        proposal_metadata={},
+        status="active",
+        yes_votes=0,
+        no_votes=0
+    )
+    db_session.add(proposal)
+    db_session.commit()
+    return proposal
 
 
-def test_health_check():
+def test_health_check(client):
     """Test the health check endpoint."""
     response = client.get("/health")
     assert response.status_code == 200
@@ -57,16 +151,31 @@ def test_health_check():
     assert "service" in data
 
 
-@patch("backend.app.main.get_neo_client")
-def test_submit_memo(mock_get_neo_client):
-    """Test submitting a new memo proposal."""
-    # Mock NEO client response
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
-    mock_get_neo_client.return_value = mock_client
+def _augment_research(payload, source=None):
+    meta = payload.get("metadata", {}).copy()
+    meta["_research"] = {"tag": "research_pipeline_v1", "note": "ok"}
+    payload["metadata"] = meta
+    return payload
+
+
+@pytest.mark.parametrize("pipeline_side_effect, expected_research", [
+    (None, None),
+    (lambda payload, source=None: payload, None),
+    (_augment_research, {"tag": "research_pipeline_v1", "note": "ok"}),
+], ids=["default-pipeline", "pipeline-invoked", "pipeline-metadata"])
+@patch("backend.app.main.schedule_manifest_refresh")
+def test_submit_memo(mock_manifest, pipeline_side_effect, expected_research,
+                     neo_mock, client, monkeypatch):
+    """
+    Test submitting a new memo proposal.
+
+    Covers the research pipeline being invoked and its metadata persisting,
+    and the manifest refresh being triggered. ``None`` runs the real pipeline.
+    """
+    mock_run_research = Mock(side_effect=pipeline_side_effect)
+    if pipeline_side_effect is not None:
+        monkeypatch.setattr(
+            "backend.app.main.run_research_pipeline", mock_run_research)
 
     memo_data = {
         "title": "Test Investment Proposal",
@@ -86,67 +195,38 @@ def test_submit_memo(mock_get_neo_client):
     assert data["status"] == "active"
     assert data["yes_votes"] == 0
     assert data["no_votes"] == 0
+    assert data["metadata"]["sector"] == "tech"
+
+    # Verify NEO client was called and the manifest refreshed
+    neo_mock.create_proposal.assert_called_once()
+    mock_manifest.assert_called_once()
 
-    # Verify NEO client was called
-    mock_client.create_proposal.assert_called_once()
+    if pipeline_side_effect is not None:
+        mock_run_research.assert_called_once()
+    if expected_research is not None:
+        assert data["metadata"]["_research"] == expected_research
 
 
-def test_get_proposals_empty():
+def test_get_proposals_empty(client):
     """Test getting proposals when none exist."""
     response = client.get("/proposals")
     assert response.status_code == 200
     assert response.json() == []
 
 
-@patch("backend.app.main.get_neo_client")
-def test_get_proposals(mock_get_neo_client):
+def test_get_proposals(created_proposal, client):
     """Test getting list of proposals."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
-    mock_get_neo_client.return_value = mock_client
-
-    # Create a proposal first
-    memo_data = {
-        "title": "Test Proposal",
-        "summary": "Summary",
-        "cid": "QmTest",
-        "confidence": 75,
-        "metadata": {}
-    }
-    client.post("/submit-memo", json=memo_data)
-
-    # Get proposals
     response = client.get("/proposals")
     assert response.status_code == 200
 
     data = response.json()
     assert len(data) == 1
-    assert data[0]["title"] == memo_data["title"]
+    assert data[0]["title"] == created_proposal.title
 
 
-@patch("backend.app.main.get_neo_client")
-def test_get_proposal_by_id(mock_get_neo_client):
+def test_get_proposal_by_id(created_proposal, client):
     """Test getting a specific proposal by ID."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
-    mock_get_neo_client.return_value = mock_client
-
-    # Create a proposal
-    memo_data = {
-        "title": "Specific Proposal",
-        "summary": "Detailed summary",
-        "cid": "QmSpecific",
-        "confidence": 90,
-        "metadata": {}
-    }
-    create_response = client.post("/submit-memo", json=memo_data)
-    proposal_id = create_response.json()["id"]
+    proposal_id = created_proposal.id
 
     # Get the specific proposal
     response = client.get(f"/proposals/{proposal_id}")
@@ -154,39 +234,18 @@ def test_get_proposal_by_id(mock_get_neo_client):
 
     data = response.json()
     assert data["id"] == proposal_id
-    assert data["title"] == memo_data["title"]
+    assert data["title"] == created_proposal.title
 
 
-def test_get_proposal_not_found():
+def test_get_proposal_not_found(client):
     """Test getting a non-existent proposal."""
     response = client.get("/proposals/999")
     assert response.status_code == 404
 
 
-@patch("backend.app.vote_service._get_neo_client")
-@patch("backend.app.main.get_neo_client")
-def test_vote_on_proposal(mock_get_neo_client, mock_get_neo_client_vote_service):
+def test_vote_on_proposal(created_proposal, neo_mock, client):
     """Test voting on a proposal."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
-    mock_client.has_voted.return_value = False
-    mock_client.vote.return_value = {"tx_hash": "0xvote5678"}
-    mock_get_neo_client.return_value = mock_client
-    mock_get_neo_client_vote_service.return_value = mock_client
-
-    # Create a proposal
-    memo_data = {
-        "title": "Voting Test",
-        "summary": "Test voting",
-        "cid": "QmVote",
-        "confidence": 80,
-        "metadata": {}
-    }
-    create_response = client.post("/submit-memo", json=memo_data)
-    proposal_id = create_response.json()["id"]
+    proposal_id = created_proposal.id
 
     # Vote yes
     vote_data = {
@@ -203,38 +262,17 @@ def test_vote_on_proposal(mock_get_neo_client, mock_get_neo_client_vote_service)
     assert data["no_votes"] == 0
 
     # Verify vote was called
-    mock_client.has_voted.assert_called_once_with(1, "NTestAddress123")
-    mock_client.vote.assert_called_once_with(
-        proposal_id=1,
+    neo_mock.has_voted.assert_called_once_with(proposal_id, "NTestAddress123")
+    neo_mock.vote.assert_called_once_with(
+        proposal_id=proposal_id,
         voter="NTestAddress123",
         choice=1
     )
 
 
-@patch("backend.app.vote_service._get_neo_client")
-@patch("backend.app.main.get_neo_client")
-def test_vote_duplicate_voter(mock_get_neo_client, mock_get_neo_client_vote_service):
+def test_vote_duplicate_voter(created_proposal, neo_mock, client):
     """Test that duplicate votes from same voter are rejected."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
-    mock_client.has_voted.return_value = False
-    mock_client.vote.return_value = {"tx_hash": "0x123"}
-    mock_get_neo_client.return_value = mock_client
-    mock_get_neo_client_vote_service.return_value = mock_client
-
-    # Create proposal
-    memo_data = {
-        "title": "Duplicate Vote Test",
-        "summary": "Test duplicate",
-        "cid": "QmDupe",
-        "confidence": 70,
-        "metadata": {}
-    }
-    create_response = client.post("/submit-memo", json=memo_data)
-    proposal_id = create_response.json()["id"]
+    proposal_id = created_proposal.id
 
     # First vote
     vote_data = {
@@ -250,38 +288,20 @@ def test_vote_duplicate_voter(mock_get_neo_client, mock_get_neo_client_vote_serv
     assert response2.status_code == 400
 
     # Vote should only have been attempted once (second call blocked before process_vote)
-    mock_client.has_voted.assert_called_once_with(1, "NVoter123")
-    mock_client.vote.assert_called_once_with(
-        proposal_id=1,
+    neo_mock.has_voted.assert_called_once_with(proposal_id, "NVoter123")
+    neo_mock.vote.assert_called_once_with(
+        proposal_id=proposal_id,
         voter="NVoter123",
         choice=1
     )
 
 
-@patch("backend.app.vote_service._get_neo_client")
-@patch("backend.app.main.get_neo_client")
-def test_vote_rejected_when_onchain_already_voted(mock_get_neo_client, mock_get_neo_client_vote_service):
+def test_vote_rejected_when_onchain_already_voted(created_proposal, neo_mock, client):
     """Ensure on-chain duplicate detection blocks voting when DB is stale."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
     # Blockchain already has a vote recorded
-    mock_client.has_voted.return_value = True
-    mock_client.vote.return_value = {"tx_hash": "0xnever"}
-    mock_get_neo_client.return_value = mock_client
-    mock_get_neo_client_vote_service.return_value = mock_client
+    neo_mock.has_voted.return_value = True
 
-    memo_data = {
-        "title": "Onchain Duplicate",
-        "summary": "Test on-chain guard",
-        "cid": "QmOnChain",
-        "confidence": 70,
-        "metadata": {}
-    }
-    create_response = client.post("/submit-memo", json=memo_data)
-    proposal_id = create_response.json()["id"]
+    proposal_id = created_proposal.id
 
     vote_data = {
         "proposal_id": proposal_id,
@@ -291,31 +311,16 @@ def test_vote_rejected_when_onchain_already_voted(mock_get_neo_client, mock_get_
 
     response = client.post("/vote", json=vote_data)
     assert response.status_code == 400
-    mock_client.has_voted.assert_called_once_with(proposal_id, "NOnChainUser")
-    mock_client.vote.assert_not_called()
+    neo_mock.has_voted.assert_called_once_with(proposal_id, "NOnChainUser")
+    neo_mock.vote.assert_not_called()
 
 
-@patch("backend.app.main.get_neo_client")
-def test_has_voted_endpoint(mock_get_neo_client):
+def test_has_voted_endpoint(created_proposal, db_session, neo_mock, client):
     """Verify has_voted endpoint checks on-chain status."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 5
-    }
-    mock_client.has_voted.return_value = True
-    mock_get_neo_client.return_value = mock_client
-
-    # Create proposal
-    memo_data = {
-        "title": "HasVoted Check",
-        "summary": "Ensure has_voted works",
-        "cid": "QmHV",
-        "confidence": 70,
-        "metadata": {}
-    }
-    create_response = client.post("/submit-memo", json=memo_data)
-    proposal_id = create_response.json()["id"]
+    neo_mock.has_voted.return_value = True
+    created_proposal.on_chain_id = 5
+    db_session.commit()
+    proposal_id = created_proposal.id
 
     # Query has-voted
     voter = "NHasVotedUser"
@@ -323,31 +328,13 @@ def test_has_voted_endpoint(mock_get_neo_client):
     assert response.status_code == 200
     data = response.json()
     assert data["has_voted"] is True
-    mock_client.has_voted.assert_called_once_with(proposal_id, voter)
+    # The endpoint checks the on-chain id, not the database id
+    neo_mock.has_voted.assert_called_once_with(5, voter)
 
 
-@patch("backend.app.main.get_neo_client")
-def test_finalize_proposal(mock_get_neo_client):
+def test_finalize_proposal(created_proposal, neo_mock, client):
     """Test finalizing a proposal."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {
-        "tx_hash": "0xabcd1234",
-        "proposal_id": 1
-    }
-    mock_client.vote.return_value = {"tx_hash": "0xvote1"}
-    mock_client.finalize_proposal.return_value = {"tx_hash": "0xfinalize789"}
-    mock_get_neo_client.return_value = mock_client
-
-    # Create proposal with votes
-    memo_data = {
-        "title": "Finalize Test",
-        "summary": "Test finalization",
-        "cid": "QmFinal",
-        "confidence": 88,
-        "metadata": {}
-    }
-    create_response = client.post("/submit-memo", json=memo_data)
-    proposal_id = create_response.json()["id"]
+    proposal_id = created_proposal.id
 
     # Add some votes
     client.post("/vote", json={
@@ -378,67 +365,15 @@ def test_finalize_proposal(mock_get_neo_client):
     assert data["no_votes"] == 1
 
     # Verify finalize was called
-    mock_client.finalize_proposal.assert_called_once()
+    neo_mock.finalize_proposal.assert_called_once()
 
 
-def test_finalize_nonexistent_proposal():
+def test_finalize_nonexistent_proposal(client):
     """Test finalizing a non-existent proposal."""
     response = client.post("/finalize", json={"proposal_id": 999})
     assert response.status_code == 404
 
 
-@patch("backend.app.main.run_research_pipeline")
-@patch("backend.app.main.get_neo_client")
-def test_submit_memo_runs_research_pipeline(mock_get_neo_client, mock_run_research):
-    """Pipeline should be invoked for memo submissions."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {"tx_hash": "0x123", "proposal_id": 42}
-    mock_get_neo_client.return_value = mock_client
-    mock_run_research.side_effect = lambda payload, source=None: payload
-
-    memo_data = {
-        "title": "Pipeline Invocation",
-        "summary": "Ensure pipeline runs",
-        "cid": "QmPipeline",
-        "confidence": 70,
-        "metadata": {"source": "test"}
-    }
-
-    response = client.post("/submit-memo", json=memo_data)
-    assert response.status_code == 200
-    mock_run_research.assert_called_once()
-
-
-@patch("backend.app.main.run_research_pipeline")
-@patch("backend.app.main.get_neo_client")
-def test_submit_memo_carries_research_metadata(mock_get_neo_client, mock_run_research):
-    """Pipeline metadata should be preserved in stored proposal."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {"tx_hash": "0x456", "proposal_id": 99}
-    mock_get_neo_client.return_value = mock_client
-
-    def _augment(payload, source=None):
-        meta = payload.get("metadata", {}).copy()
-        meta["_research"] = {"tag": "research_pipeline_v1", "note": "ok"}
-        payload["metadata"] = meta
-        return payload
-
-    mock_run_research.side_effect = _augment
-
-    memo_data = {
-        "title": "Pipeline Metadata",
-        "summary": "Ensure metadata persists",
-        "cid": "QmMeta",
-        "confidence": 80,
-        "metadata": {"sector": "tech"}
-    }
-
-    response = client.post("/submit-memo", json=memo_data)
-    assert response.status_code == 200
-    data = response.json()
-    assert data["metadata"]["_research"]["tag"] == "research_pipeline_v1"
-
-
 def test_run_research_pipeline_fail_open(monkeypatch):
     """Adapter should fail-open when pipeline raises."""
     payload = {
@@ -462,32 +397,9 @@ def test_run_research_pipeline_fail_open(monkeypatch):
         research_adapter._pipeline_process = original_process
 
 
-@patch("backend.app.main.schedule_manifest_refresh")
-@patch("backend.app.main.run_research_pipeline")
-@patch("backend.app.main.get_neo_client")
-def test_submit_memo_refreshes_manifest(mock_get_neo_client, mock_run_research, mock_manifest):
-    """Submitting a memo should trigger manifest refresh."""
-    mock_client = MagicMock()
-    mock_client.create_proposal.return_value = {"tx_hash": "0x789", "proposal_id": 7}
-    mock_get_neo_client.return_value = mock_client
-    mock_run_research.side_effect = lambda payload, source=None: payload
-
-    memo_data = {
-        "title": "Manifest Refresh",
-        "summary": "Trigger manifest update",
-        "cid": "QmManifest",
-        "confidence": 77,
-        "metadata": {}
-    }
-
-    response = client.post("/submit-memo", json=memo_data)
-    assert response.status_code == 200
-    mock_manifest.assert_called_once()
-
-
 @patch("backend.app.main.sync_from_manifest")
 @patch("backend.app.main.get_manifest_cid")
-def test_get_proposals_syncs_from_manifest(mock_get_manifest_cid, mock_sync_manifest):
+def test_get_proposals_syncs_from_manifest(mock_get_manifest_cid, mock_sync_manifest, client):
     """Fetching proposals should attempt to sync from Storacha manifest when available."""
     mock_get_manifest_cid.return_value = "bafytestcid"
     mock_sync_manifest.return_value = {"success": True, "synced": 0}
@@ -495,3 +407,40 @@ def test_get_proposals_syncs_from_manifest(mock_get_manifest_cid, mock_sync_mani
     response = client.get("/proposals")
     assert response.status_code == 200
     mock_sync_manifest.assert_called_once()
+
+
+def test_upload_manifest_prefers_gateway_link_cid(tmp_path):
+    """The gateway-link CID wins even when a bare CID is printed before it."""
+    from backend.app import manifest_manager
+
+    output = (
+        "Stored shard bafyshardcid123\n"
+        "⁂ https://storacha.link/ipfs/bafyrootcid456\n"
+    )
+    completed = Mock(returncode=0, stdout=output, stderr="")
+
+    with patch.object(manifest_manager, "STORACHA_CLI", "storacha"), \
+            patch.object(manifest_manager.shutil, "which", return_value="/usr/bin/storacha"), \
+            patch.object(manifest_manager.subprocess, "run", return_value=completed):
+        cid = manifest_manager._upload_manifest(tmp_path / "manifest.json")
+
+    assert cid == "bafyrootcid456"
+
+
+def test_create_manifest_matches_manifest_manager_format(created_proposal):
+    """The streaming CLI writer emits the same bytes as the auto-refresh one."""
+    import io
+    from backend import create_manifest
+    from backend.app import manifest_manager
+
+    with patch.object(create_manifest, "SessionLocal", TestingSessionLocal):
+        buf = io.BytesIO()
+        assert create_manifest.write_manifest(buf) == 1
+
+    with patch.object(manifest_manager, "SessionLocal", TestingSessionLocal), \
+            patch("backend.app.utils.get_current_storacha_space", return_value=None):
+        path = manifest_manager._generate_manifest_file()
+    try:
+        assert buf.getvalue() == path.read_bytes()
+    finally:
+        path.unlink()
@@ -13,147 +13,213 @@ Usage:
 import os
 import sys
 import argparse
+import hashlib
+from collections import Counter
 from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+import numpy as np
+from sqlalchemy import Integer, bindparam, column, func, select, update, values
 
-from dotenv import load_dotenv
-from backend.app.db import SessionLocal
-from backend.app.models import Proposal
+# Rows fetched per round trip when streaming proposals
+STREAM_BATCH_SIZE = 1000
 
-# Load environment variables
-env_path = project_root / '.env'
-if env_path.exists():
-    load_dotenv(env_path)
-else:
-    load_dotenv()
+# Stable across processes, unlike hash(), which is salted per interpreter
+_blake2b = hashlib.blake2b
 
 
-def calculate_varied_confidence(proposal):
+def _seed_hash(seed):
+    return int.from_bytes(_blake2b(seed.encode(), digest_size=2).digest(), "little")
+
+
+def calculate_varied_confidences(ids, titles, metadata):
     """
-    Calculate a varied confidence score based on proposal data.
+    Calculate varied confidence scores for many proposals at once.
     Uses deterministic hashing to ensure same proposal always gets same score.
+
+    Returns:
+        NumPy int array of confidence scores, aligned with ``ids``
     """
     # Use proposal ID and title to generate a deterministic but varied score
-    seed = f"{proposal.id}_{proposal.title}"
-    hash_val = hash(seed) % 100
-    
+    hash_vals = np.fromiter(
+        (_seed_hash(f"{pid}_{title}") % 100 for pid, title in zip(ids, titles)),
+        dtype=np.int64,
+        count=len(ids)
+    )
+
     # Map to confidence range 55-90 (reasonable investment range)
-    confidence = 55 + (hash_val % 36)  # Range: 55-90
-    
-    # Adjust based on existing metadata if available
-    meta = proposal.proposal_metadata or {}
-    risk_score = meta.get("risk_score")
-    if risk_score is not None:
-        # Inverse relationship: lower risk = higher confidence
-        # But keep it in reasonable range
-        risk_based = max(0, min(100, 100 - risk_score + 20))
-        # Blend: 70% hash-based, 30% risk-based for variety
-        confidence = int(confidence * 0.7 + risk_based * 0.3)
-    
+    confidence = 55 + (hash_vals % 36)  # Range: 55-90
+
+    # Adjust based on existing metadata if available (NaN where missing)
+    risk_score = np.array(
+        [(meta or {}).get("risk_score") for meta in metadata], dtype=float
+    )
+    has_risk = ~np.isnan(risk_score)
+    # Inverse relationship: lower risk = higher confidence
+    # But keep it in reasonable range
+    risk_based = np.clip(100 - np.nan_to_num(risk_score) + 20, 0, 100)
+    # Blend: 70% hash-based, 30% risk-based for variety
+    blended = (confidence * 0.7 + risk_based * 0.3).astype(np.int64)
+    confidence = np.where(has_risk, blended, confidence)
+
     # Ensure in valid range
-    confidence = max(0, min(100, confidence))
-    return confidence
+    return np.clip(confidence, 0, 100)
+
+
+def calculate_varied_confidence(proposal):
+    """Calculate a varied confidence score for a single proposal."""
+    return int(calculate_varied_confidences(
+        [proposal.id], [proposal.title], [proposal.proposal_metadata]
+    )[0])
+
+
+def _bulk_set_confidence(db, proposals, updates):
+    """
+    Write new confidence scores in a single statement.
+
+    PostgreSQL gets ``UPDATE ... FROM (VALUES ...)``; other backends get one
+    prepared UPDATE executed with all rows as an executemany.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        new_values = values(
+            column("id", Integer), column("confidence", Integer), name="new_values"
+        ).data([(u["id"], u["new"]) for u in updates])
+        db.execute(
+            update(proposals)
+            .where(proposals.c.id == new_values.c.id)
+            .values(confidence=new_values.c.confidence)
+        )
+    else:
+        db.execute(
+            update(proposals)
+            .where(proposals.c.id == bindparam("pid"))
+            .values(confidence=bindparam("conf")),
+            [{"pid": u["id"], "conf": u["new"]} for u in updates]
+        )
 
 
 def vary_confidence_scores(apply_changes=False):
     """Vary confidence scores for proposals that all have the same value."""
+    # Imported here so importing this module doesn't connect to the database
+    from backend.app.db import SessionLocal
+    from backend.app.models import Proposal
+
+    # Collect output and write it once, instead of a syscall per line
+    out = []
+    emit = out.append
+
     db = SessionLocal()
     try:
-        all_proposals = db.query(Proposal).all()
+        # Only the distribution is needed up front; let the database count it
+        confidence_counts = Counter(dict(
+            db.execute(
+                select(Proposal.confidence, func.count())
+                .group_by(Proposal.confidence)
+            ).all()
+        ))
+        total = sum(confidence_counts.values())
         
-        if not all_proposals:
-            print("No proposals found in database.")
+        if not total:
+            emit("No proposals found in database.")
             return
         
-        # Find proposals with the same confidence score
-        confidence_counts = {}
-        for prop in all_proposals:
-            conf = prop.confidence
-            confidence_counts[conf] = confidence_counts.get(conf, 0) + 1
-        
-        print("\n" + "=" * 60)
-        print("CONFIDENCE SCORE ANALYSIS")
-        print("=" * 60)
-        print(f"\nTotal proposals: {len(all_proposals)}")
-        print(f"\nConfidence score distribution:")
+        emit("\n" + "=" * 60)
+        emit("CONFIDENCE SCORE ANALYSIS")
+        emit("=" * 60)
+        emit(f"\nTotal proposals: {total}")
+        emit(f"\nConfidence score distribution:")
         for conf, count in sorted(confidence_counts.items()):
-            print(f"  {conf}: {count} proposals")
+            emit(f"  {conf}: {count} proposals")
         
         # Find the most common confidence score
         if len(confidence_counts) == 1:
             common_conf = list(confidence_counts.keys())[0]
-            print(f"\n⚠️  All proposals have the same confidence score: {common_conf}")
-            print("   This suggests LLM calls are failing or using simulated responses.")
+            emit(f"\n⚠️  All proposals have the same confidence score: {common_conf}")
+            emit("   This suggests LLM calls are failing or using simulated responses.")
         else:
-            print(f"\n✓ Proposals have varied confidence scores.")
+            emit(f"\n✓ Proposals have varied confidence scores.")
             return
         
-        # Calculate new scores
+        # Calculate new scores, streaming the affected rows in batches
+        rows = db.execute(
+            select(Proposal.id, Proposal.title, Proposal.proposal_metadata)
+            .where(Proposal.confidence == common_conf)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
         updates = []
-        for proposal in all_proposals:
-            if proposal.confidence == common_conf:
-                new_confidence = calculate_varied_confidence(proposal)
-                updates.append({
-                    "id": proposal.id,
-                    "title": proposal.title[:50],
-                    "old": proposal.confidence,
-                    "new": new_confidence
-                })
+        for batch in rows.partitions():
+            ids, titles, metadata = zip(*batch)
+            new_confidences = calculate_varied_confidences(ids, titles, metadata)
+            updates.extend(
+                {
+                    "id": pid,
+                    "title": title[:50],
+                    "old": common_conf,
+                    "new": int(new)
+                }
+                for pid, title, new in zip(ids, titles, new_confidences)
+            )
         
         if not updates:
-            print("\nNo proposals need updating.")
+            emit("\nNo proposals need updating.")
             return
         
-        print(f"\n{'=' * 60}")
-        print("PROPOSED UPDATES")
-        print("=" * 60)
-        print(f"\nWill update {len(updates)} proposals:")
-        for update in updates[:10]:  # Show first 10
-            print(f"  ID {update['id']}: {update['old']} → {update['new']} ({update['title']}...)")
+        emit(f"\n{'=' * 60}")
+        emit("PROPOSED UPDATES")
+        emit("=" * 60)
+        emit(f"\nWill update {len(updates)} proposals:")
+        for u in updates[:10]:  # Show first 10
+            emit(f"  ID {u['id']}: {u['old']} → {u['new']} ({u['title']}...)")
         if len(updates) > 10:
-            print(f"  ... and {len(updates) - 10} more")
+            emit(f"  ... and {len(updates) - 10} more")
         
         new_scores = [u["new"] for u in updates]
-        print(f"\nNew score range: {min(new_scores)} - {max(new_scores)}")
-        print(f"New score average: {sum(new_scores) / len(new_scores):.1f}")
+        emit(f"\nNew score range: {min(new_scores)} - {max(new_scores)}")
+        emit(f"New score average: {sum(new_scores) / len(new_scores):.1f}")
         
         if not apply_changes:
-            print(f"\n⚠️  This is a preview. Use --apply to update the database.")
+            emit(f"\n⚠️  This is a preview. Use --apply to update the database.")
             return
         
         # Apply changes
-        print(f"\n{'=' * 60}")
-        print("APPLYING UPDATES")
-        print("=" * 60)
-        
-        updated = 0
-        for proposal in all_proposals:
-            if proposal.confidence == common_conf:
-                new_confidence = calculate_varied_confidence(proposal)
-                proposal.confidence = new_confidence
-                updated += 1
+        emit(f"\n{'=' * 60}")
+        emit("APPLYING UPDATES")
+        emit("=" * 60)
         
+        _bulk_set_confidence(db, Proposal.__table__, updates)
         db.commit()
+        updated = len(updates)
         
-        print(f"\n✓ Successfully updated {updated} proposals with varied confidence scores.")
-        print(f"\nNew distribution:")
-        updated_proposals = db.query(Proposal).all()
-        new_counts = {}
-        for prop in updated_proposals:
-            new_counts[prop.confidence] = new_counts.get(prop.confidence, 0) + 1
-        for conf, count in sorted(new_counts.items()):
-            print(f"  {conf}: {count} proposals")
+        emit(f"\n✓ Successfully updated {updated} proposals with varied confidence scores.")
+        emit(f"\nNew distribution:")
+        new_counts = confidence_counts.copy()
+        new_counts[common_conf] -= updated
+        new_counts.update(u["new"] for u in updates)
+        for conf, count in sorted((+new_counts).items()):
+            emit(f"  {conf}: {count} proposals")
         
     except Exception as e:
         db.rollback()
-        print(f"\n❌ ERROR: Failed to update confidence scores: {e}")
+        emit(f"\n❌ ERROR: Failed to update confidence scores: {e}")
         import traceback
         traceback.print_exc()
     finally:
         db.close()
+        if out:
+            sys.stdout.write("\n".join(out) + "\n")
+
+
+def _load_environment():
+    """Put the project root on sys.path and load .env (script entry only)."""
+    project_root = Path(__file__).parent.parent
+    sys.path.insert(0, str(project_root))
+
+    from dotenv import load_dotenv
+
+    env_path = project_root / '.env'
+    if env_path.exists():
+        load_dotenv(env_path)
+    else:
+        load_dotenv()
 
 
 def main():
@@ -173,6 +239,7 @@ Examples:
     )
     
     args = parser.parse_args()
+    _load_environment()
     vary_confidence_scores(apply_changes=args.apply)
 
 
@@ -6,15 +6,38 @@ Generate NEO3 contract hash from compiled NEF and manifest files.
 import sys
 import json
 import hashlib
+import mmap
+import struct
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    # Skips hashlib's constructor lookup; same OpenSSL implementation
+    from _hashlib import openssl_sha256 as _sha256
+except ImportError:
+    _sha256 = hashlib.sha256
 
-def calculate_contract_hash(nef_path: Path, manifest_path: Path) -> str:
+
+# NEF3 header (magic + compiler), fixed part of a method token after its
+# var-string method name (parameters count u16, has return bool, call flags
+# u8), and the trailing checksum
+NEF_MAGIC = b'NEF3'
+_HEADER = struct.Struct('<4s64s')
+_TOKEN_TAIL = struct.Struct('<HBB')
+_CHECKSUM = struct.Struct('<I')
+
+
+def calculate_contract_hash(nef_path: Path, manifest_path: Path,
+                            verify_checksum: bool = False) -> str:
     """
     Calculate the contract hash (script hash) from NEF and manifest.
 
     For NEO3, the contract hash is the SHA256 hash of the contract script,
     then take the first 20 bytes (40 hex chars) and reverse the byte order.
+
+    With verify_checksum, the stored checksum must equal the first 4 bytes
+    of SHA256(SHA256(...)) over every byte before it, otherwise ValueError
+    is raised.
     """
     if not nef_path.exists():
         raise FileNotFoundError(f"NEF file not found: {nef_path}")
@@ -22,80 +45,149 @@ def calculate_contract_hash(nef_path: Path, manifest_path: Path) -> str:
     if not manifest_path.exists():
         raise FileNotFoundError(f"Manifest file not found: {manifest_path}")
 
-    # Read NEF file (binary)
-    # NEF format: magic(4) + compiler(64) + source(?) + checksum(4) + script
-    with open(nef_path, 'rb') as f:
-        nef_data = f.read()
+    # The hash depends only on the NEF bytes, so a stat-based key is enough
+    st = nef_path.stat()
+    return _hash_nef(str(nef_path), st.st_mtime_ns, st.st_size, verify_checksum)
 
-    # NEF structure (simplified):
-    # - Magic: 4 bytes (0x4E454F33 for NEO3)
-    # - Compiler: 64 bytes
-    # - Source: variable length (null-terminated string)
-    # - Reserved: 2 bytes
-    # - Checksum: 4 bytes
-    # - Script: remaining bytes
 
-    # Find script section (after magic + compiler + source + reserved + checksum)
-    # Magic (4) + Compiler (64) = 68 bytes
-    offset = 68
+@lru_cache(maxsize=64)
+def _hash_nef(nef_path: str, mtime_ns: int, size: int, verify_checksum: bool = False) -> str:
+    """Hash a NEF file; cached per (path, mtime, size)."""
+    # The file is mmap'd and hashed through memoryview slices, so neither the
+    # whole file nor the script is ever copied into a Python buffer.
+    if size < _HEADER.size:
+        raise ValueError("Invalid NEF file structure: truncated header")
 
-    # Skip source string (null-terminated)
-    while offset < len(nef_data) and nef_data[offset] != 0:
-        offset += 1
-    offset += 1  # Skip null terminator
+    with open(nef_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            magic, _compiler = _HEADER.unpack_from(view, 0)
+            if magic != NEF_MAGIC:
+                raise ValueError(f"Invalid NEF file: bad magic {magic!r}")
 
-    # Skip reserved (2 bytes) and checksum (4 bytes) = 6 bytes
-    offset += 6
+            script_start, checksum_offset = _nef3_script_span(view)
+            if verify_checksum:
+                _verify_nef3_checksum(view, checksum_offset)
 
-    # Remaining is the script
-    if offset >= len(nef_data):
-        raise ValueError("Invalid NEF file structure")
+            # Compute SHA256 hash of script
+            hash_bytes = _sha256(view[script_start:checksum_offset]).digest()
+        finally:
+            view.release()
 
-    script = nef_data[offset:]
+    # NEO3 contract hash is first 20 bytes of SHA256, reversed, as hex
+    contract_hash = hash_bytes[19::-1].hex()
 
-    # Compute SHA256 hash of script
-    hash_obj = hashlib.sha256(script)
-    hash_bytes = hash_obj.digest()
+    return contract_hash
 
-    # NEO3 contract hash is first 20 bytes of SHA256, reversed
-    script_hash_bytes = hash_bytes[:20]
-    script_hash_bytes_reversed = script_hash_bytes[::-1]
 
-    # Convert to hex string
-    contract_hash = script_hash_bytes_reversed.hex()
+def _read_var_int(view, offset: int):
+    """Read a Neo var-int at offset; return (value, offset just past it)."""
+    if offset >= len(view):
+        raise ValueError("Invalid NEF file structure: truncated var-int")
+    prefix = view[offset]
+    if prefix < 0xFD:
+        return prefix, offset + 1
+    size = {0xFD: 2, 0xFE: 4, 0xFF: 8}[prefix]
+    end = offset + 1 + size
+    if end > len(view):
+        raise ValueError("Invalid NEF file structure: truncated var-int")
+    return int.from_bytes(view[offset + 1:end], 'little'), end
 
-    return contract_hash
+
+def _skip_var_bytes(view, offset: int) -> int:
+    """Skip a var-int length prefixed byte string; return the offset after it."""
+    length, offset = _read_var_int(view, offset)
+    if offset + length > len(view):
+        raise ValueError("Invalid NEF file structure: truncated field")
+    return offset + length
+
+
+def _nef3_script_span(view):
+    """
+    Locate the script in a NEF3 file; return (script start, checksum offset).
+
+    Layout: magic(4) + compiler(64) + source(var-string) + reserved(1)
+    + tokens(var-array of hash(20) + method(var-string) + u16 + bool + u8)
+    + reserved(2) + script(var-bytes) + checksum(4)
+    """
+    offset = _skip_var_bytes(view, _HEADER.size)  # source
+    offset += 1  # reserved byte
+    token_count, offset = _read_var_int(view, offset)
+    for _ in range(token_count):
+        offset = _skip_var_bytes(view, offset + 20)  # hash, then method name
+        offset += _TOKEN_TAIL.size
+    offset += 2  # reserved u16
+    script_length, script_start = _read_var_int(view, offset)
+    checksum_offset = script_start + script_length
+
+    if script_length == 0 or checksum_offset + _CHECKSUM.size != len(view):
+        raise ValueError("Invalid NEF file structure: script does not end at the checksum")
+    return script_start, checksum_offset
+
+
+def _verify_nef3_checksum(view, checksum_offset: int) -> None:
+    """Check the stored checksum against sha256d of every byte before it."""
+    (checksum,) = _CHECKSUM.unpack_from(view, checksum_offset)
+    expected = _CHECKSUM.unpack(_sha256(_sha256(view[:checksum_offset]).digest()).digest()[:4])[0]
+    if expected != checksum:
+        raise ValueError(
+            f"NEF checksum mismatch: stored {checksum:#010x}, computed {expected:#010x}")
+
+
+def _load_cache(cache_path: Path) -> dict:
+    try:
+        return json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
 
 
 def main():
     script_dir = Path(__file__).parent
+    source_path = script_dir / "proposal_contract.py"
     nef_path = script_dir / "proposal_contract.nef"
     manifest_path = script_dir / "proposal_contract.manifest.json"
-
-    # Try to compile if files don't exist
-    if not nef_path.exists() or not manifest_path.exists():
-        print("Compiling contract first...")
-        import subprocess
-        result = subprocess.run(
-            [sys.executable, "-m", "boa3.boa3", "compile", "proposal_contract.py"],
-            cwd=script_dir,
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            print(f"Compilation failed: {result.stderr}")
+    cache_path = script_dir / ".contract_cache.json"
+
+    # Compilation and hashing are skipped while the contract source is unchanged
+    source_hash = _sha256(source_path.read_bytes()).hexdigest()
+    cache = _load_cache(cache_path)
+    artifacts_exist = nef_path.exists() and manifest_path.exists()
+    cache_hit = cache.get("source_sha256") == source_hash and artifacts_exist
+
+    if cache_hit:
+        contract_hash = cache["contract_hash"]
+    else:
+        # Compile if the artifacts are missing or were built from older source
+        if not artifacts_exist or cache.get("source_sha256") not in (None, source_hash):
+            print("Compiling contract first...")
+            import subprocess
+            result = subprocess.run(
+                [sys.executable, "-m", "boa3.boa3", "compile", "proposal_contract.py"],
+                cwd=script_dir,
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                print(f"Compilation failed: {result.stderr}")
+                sys.exit(1)
+            print("Compilation successful!")
+
+        try:
+            contract_hash = calculate_contract_hash(nef_path, manifest_path)
+        except Exception as e:
+            print(f"Error: {e}")
             sys.exit(1)
-        print("Compilation successful!")
 
-    try:
-        contract_hash = calculate_contract_hash(nef_path, manifest_path)
-        print(f"\n✅ Contract Hash: {contract_hash}")
-        print(f"\nAdd this to your .env file:")
-        print(f"NEO_CONTRACT_HASH=0x{contract_hash}")
-        return contract_hash
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+        cache_path.write_text(json.dumps({
+            "source_sha256": source_hash,
+            "contract_hash": contract_hash
+        }))
+
+    print(f"\n✅ Contract Hash: {contract_hash}")
+    print(f"\nAdd this to your .env file:")
+    print(f"NEO_CONTRACT_HASH=0x{contract_hash}")
+    return contract_hash
 
 
 if __name__ == "__main__":
@@ -9,6 +9,12 @@ This script generates a valid-format hash for testing.
 import hashlib
 import time
 
+try:
+    # Skips hashlib's constructor lookup; same OpenSSL implementation
+    from _hashlib import openssl_sha256 as _sha256
+except ImportError:
+    _sha256 = hashlib.sha256
+
 def generate_test_hash():
     """
     Generate a deterministic test hash based on contract source.
@@ -24,15 +30,11 @@ def generate_test_hash():
         source_data = f"test_contract_{time.time()}".encode()
     
     # Generate hash
-    hash_obj = hashlib.sha256(source_data)
+    hash_obj = _sha256(source_data)
     hash_bytes = hash_obj.digest()
     
-    # NEO3 contract hash is first 20 bytes, reversed
-    script_hash_bytes = hash_bytes[:20]
-    script_hash_bytes_reversed = script_hash_bytes[::-1]
-    
-    # Convert to hex string (40 characters)
-    contract_hash = script_hash_bytes_reversed.hex()
+    # NEO3 contract hash is first 20 bytes, reversed, as hex (40 characters)
+    contract_hash = hash_bytes[19::-1].hex()
     
     return contract_hash
 
@@ -30,7 +30,80 @@ VOTE_PREFIX = b'vote:'
 
 
 # Proposal structure (stored as concatenated bytes)
-# Format: title_len(2) + title + ipfs_hash_len(2) + ipfs_hash + deadline(4) + confidence(1) + yes_votes(4) + no_votes(4) + finalized(1)
+# Format: title_len(2) + title + ipfs_hash_len(2) + ipfs_hash + deadline(8) + confidence(1) + finalized(1) + yes_votes(varint) + no_votes(varint)
+# Integers are little-endian. Fixed-size field offsets are measured from the
+# end of the two strings. The vote counters come last as Neo-style varints
+# (1 byte below 0xFD, else 0xFD + u16 or 0xFE + u32), so a vote only
+# rewrites that short suffix and typical tallies cost one byte each.
+# The deadline gets 8 bytes because runtime.time is in milliseconds.
+LEN_SIZE = 2
+ID_SIZE = 4
+DEADLINE_SIZE = 8
+OFF_DEADLINE = 0
+OFF_CONFIDENCE = 8
+OFF_FIN = 9
+OFF_TALLY = 10
+
+
+def _pack(value: int, size: int) -> bytes:
+    """Encode an int as exactly `size` little-endian bytes; abort if it doesn't fit."""
+    if value < 0 or value >= 1 << (size * 8):
+        abort()
+    data = value.to_bytes()
+    while len(data) < size:
+        data = data + b'\x00'
+    return data[:size]
+
+
+def _proposal_key(proposal_id: int) -> bytes:
+    """Storage key for a proposal; build once and reuse for get and put."""
+    return PROPOSAL_PREFIX + _pack(proposal_id, ID_SIZE)
+
+
+def _read_uint(data: bytes, start: int, size: int) -> int:
+    """Read an unsigned little-endian int (NeoVM integers are signed)."""
+    return (data[start:start + size] + b'\x00').to_int()
+
+
+def _pack_varint(value: int) -> bytes:
+    if value < 0xFD:
+        return _pack(value, 1)
+    if value <= 0xFFFF:
+        return b'\xfd' + _pack(value, 2)
+    return b'\xfe' + _pack(value, 4)
+
+
+def _varint_size(data: bytes, start: int) -> int:
+    prefix = _read_uint(data, start, 1)
+    if prefix == 0xFD:
+        return 3
+    if prefix == 0xFE:
+        return 5
+    return 1
+
+
+def _read_varint(data: bytes, start: int) -> int:
+    size = _varint_size(data, start)
+    if size == 1:
+        return _read_uint(data, start, 1)
+    return _read_uint(data, start + 1, size - 1)
+
+
+def _fields_start(data: bytes) -> int:
+    """Offset of the first fixed-size field (just past the ipfs hash)."""
+    ipfs_start = LEN_SIZE + _read_uint(data, 0, LEN_SIZE)
+    return ipfs_start + LEN_SIZE + _read_uint(data, ipfs_start, LEN_SIZE)
+
+
+def _read_title(data: bytes) -> str:
+    title_len = _read_uint(data, 0, LEN_SIZE)
+    return data[LEN_SIZE:LEN_SIZE + title_len].to_str()
+
+
+def _read_ipfs_hash(data: bytes) -> str:
+    ipfs_start = LEN_SIZE + _read_uint(data, 0, LEN_SIZE)
+    ipfs_len = _read_uint(data, ipfs_start, LEN_SIZE)
+    return data[ipfs_start + LEN_SIZE:ipfs_start + LEN_SIZE + ipfs_len].to_str()
 
 
 @public
@@ -41,25 +114,31 @@ def create_proposal(title: str, ipfs_hash: str, deadline: int, confidence: int)
     Args:
         title: Proposal title
         ipfs_hash: IPFS CID for the full investment memo
-        deadline: Unix timestamp when voting ends
+        deadline: Unix timestamp in milliseconds (as runtime.time) when voting ends
         confidence: Confidence score (0-100)
         
     Returns:
         Proposal ID
     """
-    # Get next proposal ID
-    count = get(PROPOSAL_COUNT_KEY).to_int()
+    # Get next proposal ID (stored as a fixed 4-byte counter)
+    count = _read_uint(get(PROPOSAL_COUNT_KEY), 0, ID_SIZE)
     proposal_id = count + 1
     
     # Store proposal count
-    put(PROPOSAL_COUNT_KEY, proposal_id)
+    put(PROPOSAL_COUNT_KEY, _pack(proposal_id, ID_SIZE))
     
     # Create proposal key
-    proposal_key = PROPOSAL_PREFIX + proposal_id.to_bytes()
-    
-    # Store proposal data
-    # Format: title|ipfs_hash|deadline|confidence|yes_votes|no_votes|finalized
-    proposal_data = title + '|' + ipfs_hash + '|' + str(deadline) + '|' + str(confidence) + '|0|0|0'
+    proposal_key = _proposal_key(proposal_id)
+    
+    # Store proposal data in the fixed binary layout
+    title_bytes = title.to_bytes()
+    ipfs_bytes = ipfs_hash.to_bytes()
+    proposal_data = (
+        _pack(len(title_bytes), LEN_SIZE) + title_bytes
+        + _pack(len(ipfs_bytes), LEN_SIZE) + ipfs_bytes
+        + _pack(deadline, DEADLINE_SIZE) + _pack(confidence, 1) + _pack(0, 1)
+        + _pack_varint(0) + _pack_varint(0)
+    )
     put(proposal_key, proposal_data)
     
     return proposal_id
@@ -83,28 +162,25 @@ def vote(proposal_id: int, voter: UInt160, choice: int) -> bool:
         abort()
         return False
     
-    # Get proposal
-    proposal_key = PROPOSAL_PREFIX + proposal_id.to_bytes()
+    # Get proposal (fixed-width ids keep every key the same length)
+    id_bytes = _pack(proposal_id, ID_SIZE)
+    proposal_key = PROPOSAL_PREFIX + id_bytes
     proposal_data = get(proposal_key)
     
     if len(proposal_data) == 0:
         # Proposal doesn't exist
         return False
     
-    # Parse proposal data
-    parts = proposal_data.to_str().split('|')
-    if len(parts) < 7:
-        return False
-    
-    deadline = int(parts[2])
-    finalized = int(parts[6])
+    fields = _fields_start(proposal_data)
+    deadline = _read_uint(proposal_data, fields + OFF_DEADLINE, DEADLINE_SIZE)
+    finalized = _read_uint(proposal_data, fields + OFF_FIN, 1)
     
     # Check if voting is still open
     if time > deadline or finalized == 1:
         return False
     
     # Check if voter has already voted
-    vote_key = VOTE_PREFIX + proposal_id.to_bytes() + voter
+    vote_key = VOTE_PREFIX + id_bytes + voter
     if len(get(vote_key)) > 0:
         # Already voted
         return False
@@ -112,20 +188,15 @@ def vote(proposal_id: int, voter: UInt160, choice: int) -> bool:
     # Record vote
     put(vote_key, choice)
     
-    # Update vote tally
-    yes_votes = int(parts[4])
-    no_votes = int(parts[5])
-    
+    # Update vote tally in the blob read above; only the varint suffix changes
+    tally_start = fields + OFF_TALLY
+    yes_votes = _read_varint(proposal_data, tally_start)
+    no_votes = _read_varint(proposal_data, tally_start + _varint_size(proposal_data, tally_start))
     if choice == 1:
         yes_votes += 1
     else:
         no_votes += 1
-    
-    # Update proposal
-    parts[4] = str(yes_votes)
-    parts[5] = str(no_votes)
-    updated_data = '|'.join(parts)
-    put(proposal_key, updated_data)
+    put(proposal_key, proposal_data[:tally_start] + _pack_varint(yes_votes) + _pack_varint(no_votes))
     
     return True
 
@@ -142,21 +213,18 @@ def finalize_proposal(proposal_id: int) -> bool:
         True if finalized successfully
     """
     # Get proposal
-    proposal_key = PROPOSAL_PREFIX + proposal_id.to_bytes()
+    proposal_key = _proposal_key(proposal_id)
     proposal_data = get(proposal_key)
     
     if len(proposal_data) == 0:
         return False
     
-    # Parse proposal data
-    parts = proposal_data.to_str().split('|')
-    if len(parts) < 7:
-        return False
-    
-    deadline = int(parts[2])
-    yes_votes = int(parts[4])
-    no_votes = int(parts[5])
-    finalized = int(parts[6])
+    fields = _fields_start(proposal_data)
+    tally_start = fields + OFF_TALLY
+    deadline = _read_uint(proposal_data, fields + OFF_DEADLINE, DEADLINE_SIZE)
+    finalized = _read_uint(proposal_data, fields + OFF_FIN, 1)
+    yes_votes = _read_varint(proposal_data, tally_start)
+    no_votes = _read_varint(proposal_data, tally_start + _varint_size(proposal_data, tally_start))
     
     # Check if already finalized
     if finalized == 1:
@@ -168,15 +236,17 @@ def finalize_proposal(proposal_id: int) -> bool:
         return False
     
     # Mark as finalized
-    parts[6] = '1'
-    updated_data = '|'.join(parts)
+    fin_start = fields + OFF_FIN
+    updated_data = proposal_data[:fin_start] + _pack(1, 1) + proposal_data[fin_start + 1:]
     put(proposal_key, updated_data)
     
     # Invoke user-extensible hooks based on outcome
+    title = _read_title(proposal_data)
+    ipfs_hash = _read_ipfs_hash(proposal_data)
     if yes_votes > no_votes:
-        on_proposal_approved(proposal_id, parts[0], parts[1], yes_votes, no_votes)
+        on_proposal_approved(proposal_id, title, ipfs_hash, yes_votes, no_votes)
     else:
-        on_proposal_rejected(proposal_id, parts[0], parts[1], yes_votes, no_votes)
+        on_proposal_rejected(proposal_id, title, ipfs_hash, yes_votes, no_votes)
     
     return True
 
@@ -210,13 +280,25 @@ def get_proposal(proposal_id: int) -> str:
     Returns:
         Proposal data as string (format: title|ipfs_hash|deadline|confidence|yes_votes|no_votes|finalized)
     """
-    proposal_key = PROPOSAL_PREFIX + proposal_id.to_bytes()
+    proposal_key = _proposal_key(proposal_id)
     proposal_data = get(proposal_key)
     
     if len(proposal_data) == 0:
         return ''
     
-    return proposal_data.to_str()
+    # Storage is binary; keep the string view stable for off-chain readers
+    fields = _fields_start(proposal_data)
+    tally_start = fields + OFF_TALLY
+    no_start = tally_start + _varint_size(proposal_data, tally_start)
+    return (
+        _read_title(proposal_data) + '|'
+        + _read_ipfs_hash(proposal_data) + '|'
+        + str(_read_uint(proposal_data, fields + OFF_DEADLINE, DEADLINE_SIZE)) + '|'
+        + str(_read_uint(proposal_data, fields + OFF_CONFIDENCE, 1)) + '|'
+        + str(_read_varint(proposal_data, tally_start)) + '|'
+        + str(_read_varint(proposal_data, no_start)) + '|'
+        + str(_read_uint(proposal_data, fields + OFF_FIN, 1))
+    )
 
 
 @public
@@ -227,10 +309,8 @@ def get_proposal_count() -> int:
     Returns:
         Proposal count
     """
-    count = get(PROPOSAL_COUNT_KEY)
-    if len(count) == 0:
-        return 0
-    return count.to_int()
+    # Missing key reads as 0
+    return _read_uint(get(PROPOSAL_COUNT_KEY), 0, ID_SIZE)
 
 
 @public
@@ -245,7 +325,7 @@ def has_voted(proposal_id: int, voter: UInt160) -> bool:
     Returns:
         True if the voter has voted
     """
-    vote_key = VOTE_PREFIX + proposal_id.to_bytes() + voter
+    vote_key = VOTE_PREFIX + _pack(proposal_id, ID_SIZE) + voter
     return len(get(vote_key)) > 0
 
 
@@ -261,7 +341,7 @@ def get_vote(proposal_id: int, voter: UInt160) -> int:
     Returns:
         Vote (1 for yes, 0 for no, -1 if not voted)
     """
-    vote_key = VOTE_PREFIX + proposal_id.to_bytes() + voter
+    vote_key = VOTE_PREFIX + _pack(proposal_id, ID_SIZE) + voter
     vote_data = get(vote_key)
     
     if len(vote_data) == 0:
@@ -3,229 +3,422 @@ Unit tests for NEO smart contract.
 Uses mocked contract execution for testing logic.
 """
 
+import hashlib
+import importlib
+import struct
+import sys
+import types
+
 import pytest
 from unittest.mock import MagicMock, patch
 
+from contracts.generate_hash import calculate_contract_hash
+
+
+class NeoInt(int):
+    """int with NeoVM's to_bytes(): minimal signed little-endian."""
+
+    def to_bytes(self):
+        if self == 0:
+            return NeoBytes()
+        return NeoBytes(int(self).to_bytes((self.bit_length() + 8) // 8, 'little', signed=True))
+
+
+class NeoBytes(bytes):
+    """bytes with NeoVM's to_int()/to_str(); slices and sums stay NeoBytes."""
+
+    def __getitem__(self, key):
+        item = super().__getitem__(key)
+        return NeoBytes(item) if isinstance(key, slice) else item
+
+    def __add__(self, other):
+        return NeoBytes(bytes(self) + bytes(other))
+
+    def __radd__(self, other):
+        return NeoBytes(bytes(other) + bytes(self))
+
+    def to_int(self):
+        return int.from_bytes(self, 'little', signed=True)
+
+    def to_str(self):
+        return self.decode()
+
+
+class ContractAbort(Exception):
+    """Raised by the abort() shim."""
+
+
+def _abort():
+    raise ContractAbort()
+
+
+def _load_contract():
+    """Import proposal_contract with just enough of boa3 to define its functions."""
+    builtin = types.ModuleType('boa3.builtin')
+    builtin.NeoMetadata = MagicMock
+    builtin.metadata = builtin.public = lambda fn: fn
+    modules = {
+        'boa3': types.ModuleType('boa3'),
+        'boa3.builtin': builtin,
+        'boa3.builtin.contract': types.SimpleNamespace(abort=_abort),
+        'boa3.builtin.interop': types.ModuleType('boa3.builtin.interop'),
+        'boa3.builtin.interop.runtime': types.SimpleNamespace(
+            check_witness=None, time=0, executing_script_hash=None),
+        'boa3.builtin.interop.storage': types.SimpleNamespace(delete=None, get=None, put=None),
+        'boa3.builtin.type': types.SimpleNamespace(UInt160=bytes),
+    }
+    with patch.dict(sys.modules, modules):
+        sys.modules.pop('contracts.proposal_contract', None)
+        return importlib.import_module('contracts.proposal_contract')
+
+
+contract = _load_contract()
+
+
+def encode_varint(value):
+    """Neo-style varint, as used by NEF files."""
+    if value < 0xFD:
+        return value.to_bytes(1, 'little')
+    if value <= 0xFFFF:
+        return b'\xfd' + value.to_bytes(2, 'little')
+    return b'\xfe' + value.to_bytes(4, 'little')
+
+
+def storage_key(proposal_id, voter=None):
+    """Proposal key, or a voter's vote key, built like the contract builds them."""
+    if voter is None:
+        return bytes(contract._proposal_key(NeoInt(proposal_id)))
+    return bytes(contract.VOTE_PREFIX + contract._pack(NeoInt(proposal_id), contract.ID_SIZE) + voter)
+
+
+def encode_proposal(title, ipfs_hash, deadline, confidence, yes_votes=0, no_votes=0, finalized=0):
+    """Encode a proposal with the contract's helpers, as create_proposal does."""
+    title_bytes = title.encode()
+    ipfs_bytes = ipfs_hash.encode()
+    return bytes(
+        contract._pack(NeoInt(len(title_bytes)), contract.LEN_SIZE) + title_bytes
+        + contract._pack(NeoInt(len(ipfs_bytes)), contract.LEN_SIZE) + ipfs_bytes
+        + contract._pack(NeoInt(deadline), contract.DEADLINE_SIZE)
+        + contract._pack(NeoInt(confidence), 1)
+        + contract._pack(NeoInt(finalized), 1)
+        + contract._pack_varint(NeoInt(yes_votes))
+        + contract._pack_varint(NeoInt(no_votes))
+    )
+
+
+def decode_proposal(data):
+    """Decode stored proposal bytes with the contract's readers."""
+    data = NeoBytes(data)
+    fields = contract._fields_start(data)
+    tally_start = fields + contract.OFF_TALLY
+    no_start = tally_start + contract._varint_size(data, tally_start)
+    return {
+        'title': contract._read_title(data),
+        'ipfs_hash': contract._read_ipfs_hash(data),
+        'deadline': contract._read_uint(data, fields + contract.OFF_DEADLINE, contract.DEADLINE_SIZE),
+        'confidence': contract._read_uint(data, fields + contract.OFF_CONFIDENCE, 1),
+        'finalized': contract._read_uint(data, fields + contract.OFF_FIN, 1),
+        'yes_votes': contract._read_varint(data, tally_start),
+        'no_votes': contract._read_varint(data, no_start),
+    }
+
 
 class MockStorage:
     """Mock storage for testing contract functions."""
-    
+
+    # Value encoders keyed by exact type (one dict lookup per put)
+    _ENCODERS = {
+        int: lambda v: str(v).encode(),
+        str: lambda v: v.encode(),
+        bytes: lambda v: v,
+    }
+
     def __init__(self):
         self.data = {}
-    
+
     def put(self, key, value):
         """Store a value."""
-        if isinstance(key, bytes):
-            key = key.hex()
-        if isinstance(value, int):
-            value = str(value).encode()
-        if isinstance(value, str):
-            value = value.encode()
+        try:
+            encode = self._ENCODERS[type(value)]
+        except KeyError:
+            encode = bytes
+        self.data[key] = encode(value)
+
+    def put_bytes(self, key, value):
+        """Store a value that is already bytes."""
         self.data[key] = value
-    
+
+    def put_int(self, key, value):
+        """Store an int the way put() would."""
+        self.data[key] = str(value).encode()
+
     def get(self, key):
         """Retrieve a value."""
-        if isinstance(key, bytes):
-            key = key.hex()
         return self.data.get(key, b'')
-    
+
     def delete(self, key):
         """Delete a value."""
-        if isinstance(key, bytes):
-            key = key.hex()
-        if key in self.data:
-            del self.data[key]
+        self.data.pop(key, None)
 
 
 class TestProposalContract:
     """Tests for proposal contract logic."""
-    
+
     def setup_method(self):
         """Setup test fixtures."""
         self.storage = MockStorage()
-    
+
     def test_create_proposal(self):
         """Test creating a new proposal."""
         # Simulate contract behavior
-        count_key = b'proposal_count'
-        
+        count_key = contract.PROPOSAL_COUNT_KEY
+
         # Initial count should be 0
         count = self.storage.get(count_key)
         assert count == b''
-        
+
         # Create first proposal
         proposal_id = 1
-        self.storage.put(count_key, proposal_id)
-        
+        self.storage.put(count_key, bytes(contract._pack(NeoInt(proposal_id), contract.ID_SIZE)))
+
         # Store proposal data
-        proposal_key = b'proposal:' + str(proposal_id).encode()
-        proposal_data = 'Test Proposal|QmTest123|1234567890|85|0|0|0'
+        proposal_key = storage_key(proposal_id)
+        proposal_data = encode_proposal('Test Proposal', 'QmTest123', 1234567890, 85)
         self.storage.put(proposal_key, proposal_data)
-        
+
         # Verify stored
         stored_count = self.storage.get(count_key)
-        assert stored_count == b'1'
-        
+        assert int.from_bytes(stored_count, 'little') == 1
+
         stored_proposal = self.storage.get(proposal_key)
         assert b'Test Proposal' in stored_proposal
         assert b'QmTest123' in stored_proposal
-    
+
     def test_vote_on_proposal(self):
         """Test voting on a proposal."""
         # Setup: create a proposal
         proposal_id = 1
-        proposal_key = b'proposal:' + str(proposal_id).encode()
-        proposal_data = 'Test Proposal|QmTest123|9999999999|85|0|0|0'
+        proposal_key = storage_key(proposal_id)
+        proposal_data = encode_proposal('Test Proposal', 'QmTest123', 2000000000, 85)
         self.storage.put(proposal_key, proposal_data)
-        
+
         # Vote yes
         voter = b'NTestVoter123'
-        vote_key = b'vote:' + str(proposal_id).encode() + voter
+        vote_key = storage_key(proposal_id, voter)
         choice = 1
-        
+
         # Check voter hasn't voted yet
         existing_vote = self.storage.get(vote_key)
         assert existing_vote == b''
-        
+
         # Record vote
         self.storage.put(vote_key, choice)
-        
+
         # Update proposal tally
-        parts = proposal_data.split('|')
-        yes_votes = int(parts[4]) + 1
-        parts[4] = str(yes_votes)
-        updated_data = '|'.join(parts)
+        proposal = decode_proposal(proposal_data)
+        proposal['yes_votes'] += 1
+        updated_data = encode_proposal(**proposal)
         self.storage.put(proposal_key, updated_data)
-        
+
         # Verify vote recorded
         stored_vote = self.storage.get(vote_key)
         assert stored_vote == b'1'
-        
+
         # Verify tally updated
-        stored_proposal = self.storage.get(proposal_key).decode()
-        parts = stored_proposal.split('|')
-        assert parts[4] == '1'  # yes_votes
-        assert parts[5] == '0'  # no_votes
-    
+        stored_proposal = self.storage.get(proposal_key)
+        proposal = decode_proposal(stored_proposal)
+        assert proposal['yes_votes'] == 1
+        assert proposal['no_votes'] == 0
+
     def test_duplicate_vote_rejected(self):
         """Test that duplicate votes are rejected."""
         # Setup: create a proposal and vote once
         proposal_id = 1
-        proposal_key = b'proposal:' + str(proposal_id).encode()
-        proposal_data = 'Test Proposal|QmTest123|9999999999|85|1|0|0'
+        proposal_key = storage_key(proposal_id)
+        proposal_data = encode_proposal('Test Proposal', 'QmTest123', 2000000000, 85, yes_votes=1)
         self.storage.put(proposal_key, proposal_data)
-        
+
         voter = b'NTestVoter123'
-        vote_key = b'vote:' + str(proposal_id).encode() + voter
+        vote_key = storage_key(proposal_id, voter)
         self.storage.put(vote_key, 1)
-        
+
         # Try to vote again
         existing_vote = self.storage.get(vote_key)
         assert existing_vote != b''  # Already voted
-        
+
         # Vote should be rejected (would be checked in contract logic)
         # In real contract, this would return False
-    
+
     def test_finalize_proposal(self):
         """Test finalizing a proposal."""
         # Setup: create a proposal with votes
         proposal_id = 1
-        proposal_key = b'proposal:' + str(proposal_id).encode()
-        proposal_data = 'Test Proposal|QmTest123|1000000000|85|5|2|0'
+        proposal_key = storage_key(proposal_id)
+        proposal_data = encode_proposal(
+            'Test Proposal', 'QmTest123', 1000000000, 85, yes_votes=5, no_votes=2)
         self.storage.put(proposal_key, proposal_data)
-        
+
         # Finalize
-        parts = proposal_data.split('|')
-        parts[6] = '1'  # Set finalized flag
-        finalized_data = '|'.join(parts)
+        proposal = decode_proposal(proposal_data)
+        proposal['finalized'] = 1  # Set finalized flag
+        finalized_data = encode_proposal(**proposal)
         self.storage.put(proposal_key, finalized_data)
-        
+
         # Verify finalized
-        stored_proposal = self.storage.get(proposal_key).decode()
-        parts = stored_proposal.split('|')
-        assert parts[6] == '1'  # finalized
-        assert parts[4] == '5'  # yes_votes preserved
-        assert parts[5] == '2'  # no_votes preserved
-    
+        stored_proposal = self.storage.get(proposal_key)
+        proposal = decode_proposal(stored_proposal)
+        assert proposal['finalized'] == 1
+        assert proposal['yes_votes'] == 5  # yes_votes preserved
+        assert proposal['no_votes'] == 2  # no_votes preserved
+        assert len(stored_proposal) == len(proposal_data)
+
     def test_get_proposal(self):
         """Test retrieving proposal data."""
         # Setup: create a proposal
         proposal_id = 1
-        proposal_key = b'proposal:' + str(proposal_id).encode()
-        proposal_data = 'Investment in TestCo|QmAbc123|1234567890|78|10|3|0'
+        proposal_key = storage_key(proposal_id)
+        proposal_data = encode_proposal(
+            'Investment in TestCo', 'QmAbc123', 1234567890, 78, yes_votes=10, no_votes=3)
         self.storage.put(proposal_key, proposal_data)
-        
+
         # Retrieve
-        stored = self.storage.get(proposal_key).decode()
-        
+        stored = self.storage.get(proposal_key)
+
         # Parse and verify
-        parts = stored.split('|')
-        assert parts[0] == 'Investment in TestCo'
-        assert parts[1] == 'QmAbc123'
-        assert parts[2] == '1234567890'
-        assert parts[3] == '78'
-        assert parts[4] == '10'
-        assert parts[5] == '3'
-        assert parts[6] == '0'
-    
+        assert decode_proposal(stored) == {
+            'title': 'Investment in TestCo',
+            'ipfs_hash': 'QmAbc123',
+            'deadline': 1234567890,
+            'confidence': 78,
+            'finalized': 0,
+            'yes_votes': 10,
+            'no_votes': 3,
+        }
+
     def test_get_proposal_count(self):
         """Test getting proposal count."""
-        count_key = b'proposal_count'
-        
+        count_key = contract.PROPOSAL_COUNT_KEY
+
         # Initially empty
         count = self.storage.get(count_key)
         assert count == b''
-        
+
         # After creating proposals
-        self.storage.put(count_key, 5)
+        self.storage.put(count_key, bytes(contract._pack(NeoInt(5), contract.ID_SIZE)))
         count = self.storage.get(count_key)
-        assert count == b'5'
-    
+        assert len(count) == 4
+        assert int.from_bytes(count, 'little') == 5
+
     def test_proposal_lifecycle(self):
         """Test complete proposal lifecycle: create -> vote -> finalize."""
         # 1. Create proposal
         proposal_id = 1
-        count_key = b'proposal_count'
-        proposal_key = b'proposal:' + str(proposal_id).encode()
-        
-        self.storage.put(count_key, proposal_id)
-        proposal_data = 'DAO Proposal|QmHash|9999999999|90|0|0|0'
-        self.storage.put(proposal_key, proposal_data)
-        
+        count_key = contract.PROPOSAL_COUNT_KEY
+        proposal_key = storage_key(proposal_id)
+
+        self.storage.put_bytes(count_key, bytes(contract._pack(NeoInt(proposal_id), contract.ID_SIZE)))
+        proposal_data = encode_proposal('DAO Proposal', 'QmHash', 2000000000, 90)
+        self.storage.put_bytes(proposal_key, proposal_data)
+
         # 2. Multiple votes
         voters = [b'Voter1', b'Voter2', b'Voter3', b'Voter4', b'Voter5']
         votes = [1, 1, 0, 1, 1]  # 4 yes, 1 no
-        
-        parts = proposal_data.split('|')
+
+        proposal = decode_proposal(proposal_data)
+        yes_count, no_count = proposal['yes_votes'], proposal['no_votes']
         for i, voter in enumerate(voters):
-            vote_key = b'vote:' + str(proposal_id).encode() + voter
-            self.storage.put(vote_key, votes[i])
-            
+            vote_key = storage_key(proposal_id, voter)
+            self.storage.put_int(vote_key, votes[i])
+
             if votes[i] == 1:
-                parts[4] = str(int(parts[4]) + 1)
+                yes_count += 1
             else:
-                parts[5] = str(int(parts[5]) + 1)
-        
-        proposal_data = '|'.join(parts)
-        self.storage.put(proposal_key, proposal_data)
-        
+                no_count += 1
+
+        # Encode the tally once after all votes
+        proposal['yes_votes'], proposal['no_votes'] = yes_count, no_count
+        proposal_data = encode_proposal(**proposal)
+        self.storage.put_bytes(proposal_key, proposal_data)
+
         # 3. Finalize
-        parts = proposal_data.split('|')
-        parts[6] = '1'
-        finalized_data = '|'.join(parts)
-        self.storage.put(proposal_key, finalized_data)
-        
+        proposal['finalized'] = 1
+        finalized_data = encode_proposal(**proposal)
+        self.storage.put_bytes(proposal_key, finalized_data)
+
         # 4. Verify final state
-        final = self.storage.get(proposal_key).decode()
-        parts = final.split('|')
-        
-        assert parts[0] == 'DAO Proposal'
-        assert parts[4] == '4'  # 4 yes votes
-        assert parts[5] == '1'  # 1 no vote
-        assert parts[6] == '1'  # finalized
-        
+        final = decode_proposal(self.storage.get(proposal_key))
+        yes_votes = final['yes_votes']
+        no_votes = final['no_votes']
+
+        assert final['title'] == 'DAO Proposal'
+        assert yes_votes == 4  # 4 yes votes
+        assert no_votes == 1  # 1 no vote
+        assert final['finalized'] == 1  # finalized
+
         # Proposal approved (yes > no)
-        assert int(parts[4]) > int(parts[5])
+        assert yes_votes > no_votes
+
+    def test_vote_counters_grow_as_varints(self):
+        """Counters take one byte until 0xFD, then widen without losing data."""
+        small = encode_proposal('Varint', 'QmVar', 2000000000, 80, yes_votes=0xFC)
+        large = encode_proposal('Varint', 'QmVar', 2000000000, 80, yes_votes=0xFD)
+        huge = encode_proposal('Varint', 'QmVar', 2000000000, 80, yes_votes=0x10000, no_votes=7)
+
+        assert len(large) == len(small) + 2
+        assert decode_proposal(large)['yes_votes'] == 0xFD
+        assert decode_proposal(huge)['yes_votes'] == 0x10000
+        assert decode_proposal(huge)['no_votes'] == 7
+
+    def test_millisecond_deadline_round_trips(self):
+        """runtime.time is in milliseconds, so deadlines need more than 4 bytes."""
+        deadline_ms = 1767225600000  # 2026-01-01T00:00:00Z
+        assert deadline_ms >= 1 << 32
+        with pytest.raises(ContractAbort):
+            contract._pack(NeoInt(deadline_ms), 4)
+
+        proposal_data = encode_proposal('Ms Deadline', 'QmMs', deadline_ms, 70, yes_votes=3)
+        proposal = decode_proposal(proposal_data)
+        assert proposal['deadline'] == deadline_ms
+        assert proposal['confidence'] == 70
+        assert proposal['yes_votes'] == 3
+
+        # Voting is open before the deadline and closed after it
+        now_ms = deadline_ms - 60000
+        assert not now_ms > proposal['deadline']
+        assert now_ms + 120000 > proposal['deadline']
+
+
+def build_nef3(script, source='https://github.com/example/contract', tokens=()):
+    """Build a NEF file in the real NEF3 layout, with a valid checksum."""
+    def var_bytes(data):
+        return encode_varint(len(data)) + data
+
+    body = b'NEF3' + b'neo3-boa 1.1.1'.ljust(64, b'\x00')
+    body += var_bytes(source.encode()) + b'\x00'
+    body += encode_varint(len(tokens))
+    for token_hash, method, params, has_return, call_flags in tokens:
+        body += token_hash + var_bytes(method.encode()) + struct.pack('<HBB', params, has_return, call_flags)
+    body += b'\x00\x00' + var_bytes(script)
+    return body + hashlib.sha256(hashlib.sha256(body).digest()).digest()[:4]
+
+
+def test_verify_checksum_on_real_nef3_layout(tmp_path):
+    """--verify-checksum accepts a real NEF3 file and rejects a corrupted one."""
+    manifest_path = tmp_path / 'contract.manifest.json'
+    manifest_path.write_text('{}')
+    script = b'\x0c\x05hello\x40' * 50
+    nef = build_nef3(script, tokens=[(b'\xab' * 20, 'transfer', 4, 1, 0x0F)])
+
+    nef_path = tmp_path / 'contract.nef'
+    nef_path.write_bytes(nef)
+    expected_hash = hashlib.sha256(script).digest()[19::-1].hex()
+    assert calculate_contract_hash(nef_path, manifest_path, verify_checksum=True) == expected_hash
+    assert calculate_contract_hash(nef_path, manifest_path) == expected_hash
+
+    corrupt_path = tmp_path / 'corrupt.nef'
+    corrupt_path.write_bytes(nef[:-10] + bytes([nef[-10] ^ 0xFF]) + nef[-9:])
+    with pytest.raises(ValueError, match='checksum mismatch'):
+        calculate_contract_hash(corrupt_path, manifest_path, verify_checksum=True)
 
 
 if __name__ == "__main__":
@@ -8,14 +8,23 @@ This script demonstrates the complete research and analysis pipeline:
 3. Present a consolidated report with detailed analysis
 """
 import asyncio
-import copy
-import json
+import hashlib
 import argparse
 import os
-from typing import Dict, List, Tuple, Optional, Any
+import sys
+import textwrap
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, List, Tuple, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+import orjson
 
 # Import agents
 from spoon_ai.agents.research_agent import ResearchAgent
@@ -32,6 +41,69 @@ RESEARCH_METADATA_KEY = "_research"
 RESEARCH_PIPELINE_TAG = "research_pipeline_v1"
 # Default test-mode toggle (used to keep behavior non-intrusive unless configured)
 PIPELINE_TEST_MODE = os.getenv("RESEARCH_PIPELINE_TEST_MODE", "true").lower() == "true"
+# Analyst reviews memoized by (analyst name, summary digest). Entries are
+# concurrent futures so callers on any event loop can share an in-flight review.
+ANALYSIS_CACHE_SIZE = 1024
+_ANALYSIS_CACHE: "OrderedDict[Tuple[str, str], Future]" = OrderedDict()
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+# Research results for process_proposal, keyed by (test_mode, project, type)
+# and stored as (expires_at, future) so replays coalesce into one lookup.
+RESEARCH_CACHE_SIZE = 512
+RESEARCH_CACHE_TTL = 1800
+_RESEARCH_CACHE: "OrderedDict[Tuple[bool, str, str], Tuple[float, Future]]" = OrderedDict()
+_RESEARCH_CACHE_LOCK = threading.Lock()
+# Longest process_proposal waits for the pipeline before failing open; the
+# backend adapter stops waiting after the same RESEARCH_PIPELINE_TIMEOUT
+PIPELINE_TIMEOUT = float(os.getenv("RESEARCH_PIPELINE_TIMEOUT", "2.0"))
+# Background event loop shared by every process_proposal call
+_BG_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_BG_LOOP_LOCK = threading.Lock()
+# One pipeline (and analyst set) per test_mode, reused across proposals
+_PIPELINE_CACHE: Dict[bool, "ResearchPipeline"] = {}
+_PIPELINE_CACHE_LOCK = threading.Lock()
+
+def _md_section(line: str) -> str:
+    return f"\n{' ' + line[3:].strip().upper() + ' ':-^80}"
+
+def _md_subsection(line: str) -> str:
+    title = line[4:]
+    return f"\n{title.upper()}\n{'-' * len(title)}"
+
+def _md_list_item(line: str) -> str:
+    return f"  • {line[2:]}"
+
+# Line prefix -> formatter for the markdown subset used in research summaries
+_MD_DISPATCH = (
+    ('## ', _md_section),
+    ('### ', _md_subsection),
+    ('- ', _md_list_item),
+)
+
+@lru_cache(maxsize=128)
+def _render_summary(summary: str) -> Tuple[str, ...]:
+    """Render a research summary into report lines.
+
+    Summaries never change once researched, so printing the same result
+    again (or another result for the same project) reuses the rendering.
+    """
+    rendered = []
+    for line in summary.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        for prefix, formatter in _MD_DISPATCH:
+            if line.startswith(prefix):
+                rendered.append(formatter(line))
+                break
+        else:
+            # Regular text: simple word wrap for long lines
+            rendered.extend(f"  {wrapped_line}" for wrapped_line in textwrap.wrap(line, width=78))
+    return tuple(rendered)
+
+# Justification lines that get their own paragraph
+_VERDICT_MARKS = ('✅', '⚠️', '❌')
+# Per-analyst fields reduced by _generate_final_verdict
+_VERDICT_DTYPE = np.dtype([('vote', '?'), ('risk_score', 'f8'), ('confidence', 'f8')])
 
 class ProjectType(str, Enum):
     """Supported project types for analysis."""
@@ -41,9 +113,16 @@ class ProjectType(str, Enum):
     FINANCE = "finance"
     OTHER = "other"
 
-@dataclass
+# Value -> member table so lookups skip the Enum constructor
+_PROJECT_TYPE_MAP = {pt.value: pt for pt in ProjectType}
+_DEFAULT_PROJECT_TYPE = ProjectType.TECH_STARTUP
+
+@dataclass(slots=True, frozen=True)
 class ResearchResult:
-    """Container for research results."""
+    """Container for research results.
+    
+    Frozen because cached results are shared between pipeline runs.
+    """
     project_name: str
     project_type: ProjectType
     summary: str
@@ -52,7 +131,11 @@ class ResearchResult:
     
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.utcnow().isoformat()
+            object.__setattr__(self, 'timestamp', datetime.utcnow().isoformat())
+
+def _project_type(value: str) -> ProjectType:
+    """Return the ProjectType for value, raising ValueError if it is unknown."""
+    return _PROJECT_TYPE_MAP.get(value) or ProjectType(value)
 
 class TestResearchAgent:
     """Mock research agent for testing with predefined data."""
@@ -66,7 +149,7 @@ class TestResearchAgent:
             data = self.test_data[project_name]
             return ResearchResult(
                 project_name=project_name,
-                project_type=ProjectType(data.get('type', 'other')),
+                project_type=_project_type(data.get('type', 'other')),
                 summary=data.get('summary', ''),
                 raw_data=data.get('data', {})
             )
@@ -79,6 +162,91 @@ class TestResearchAgent:
             raw_data={"info": "Test data"}
         )
 
+async def _analyze_cached(analyst: BaseAnalystAgent, summary: str) -> AnalystRecommendation:
+    """Run analyst.analyze(summary) once per distinct summary and share the result."""
+    digest = hashlib.blake2b(summary.encode(), digest_size=16).hexdigest()
+    key = (analyst.name, digest)
+    with _ANALYSIS_CACHE_LOCK:
+        future = _ANALYSIS_CACHE.get(key)
+        owner = future is None
+        if owner:
+            # Register before running so concurrent callers await this review
+            future = Future()
+            _ANALYSIS_CACHE[key] = future
+            if len(_ANALYSIS_CACHE) > ANALYSIS_CACHE_SIZE:
+                _ANALYSIS_CACHE.popitem(last=False)
+        else:
+            _ANALYSIS_CACHE.move_to_end(key)
+
+    if not owner:
+        return await asyncio.wrap_future(future)
+
+    try:
+        # analyze() is pure-Python scoring with no I/O; a worker thread would
+        # only add a thread hop, since the GIL serializes the reviews anyway
+        result = analyst.analyze(summary)
+    except BaseException as exc:
+        # Don't cache failures; the next caller retries
+        with _ANALYSIS_CACHE_LOCK:
+            if _ANALYSIS_CACHE.get(key) is future:
+                del _ANALYSIS_CACHE[key]
+        future.set_exception(exc)
+        raise
+    future.set_result(result)
+    return result
+
+async def _research_cached(pipeline: "ResearchPipeline", project_name: str, project_type: ProjectType) -> ResearchResult:
+    """Research a project once per RESEARCH_CACHE_TTL and share the result."""
+    key = (pipeline.test_mode, project_name, project_type.value)
+    now = time.monotonic()
+    with _RESEARCH_CACHE_LOCK:
+        entry = _RESEARCH_CACHE.get(key)
+        owner = entry is None or entry[0] <= now
+        if owner:
+            future = Future()
+            _RESEARCH_CACHE[key] = (now + RESEARCH_CACHE_TTL, future)
+            _RESEARCH_CACHE.move_to_end(key)
+            if len(_RESEARCH_CACHE) > RESEARCH_CACHE_SIZE:
+                _RESEARCH_CACHE.popitem(last=False)
+        else:
+            future = entry[1]
+            _RESEARCH_CACHE.move_to_end(key)
+
+    if not owner:
+        return await asyncio.wrap_future(future)
+
+    try:
+        research = await pipeline.research_agent.research_project(project_name, project_type)
+    except BaseException as exc:
+        with _RESEARCH_CACHE_LOCK:
+            entry = _RESEARCH_CACHE.get(key)
+            if entry is not None and entry[1] is future:
+                del _RESEARCH_CACHE[key]
+        future.set_exception(exc)
+        raise
+    future.set_result(research)
+    return research
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared event loop, starting its daemon thread on first use."""
+    global _BG_LOOP
+    with _BG_LOOP_LOCK:
+        if _BG_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="research-pipeline-loop", daemon=True
+            ).start()
+            _BG_LOOP = loop
+        return _BG_LOOP
+
+def _shared_pipeline(test_mode: bool) -> "ResearchPipeline":
+    """Return the cached pipeline for test_mode, building it on first use."""
+    with _PIPELINE_CACHE_LOCK:
+        pipeline = _PIPELINE_CACHE.get(test_mode)
+        if pipeline is None:
+            pipeline = _PIPELINE_CACHE[test_mode] = ResearchPipeline(test_mode=test_mode)
+        return pipeline
+
 class ResearchPipeline:
     """Complete research and analysis pipeline for various project types."""
     
@@ -100,7 +268,8 @@ class ResearchPipeline:
     async def analyze_project(
         self, 
         project_name: str, 
-        project_type: ProjectType = ProjectType.OTHER
+        project_type: ProjectType = ProjectType.OTHER,
+        research: Optional[ResearchResult] = None
     ) -> Dict:
         """
         Complete research and analysis of a project.
@@ -108,6 +277,7 @@ class ResearchPipeline:
         Args:
             project_name: Name of the project to analyze
             project_type: Type of the project (crypto, biotech, etc.)
+            research: Optional research already gathered for the project
             
         Returns:
             Dictionary containing complete analysis results
@@ -115,19 +285,20 @@ class ResearchPipeline:
         print(f"🔍 Starting research on {project_name} ({project_type.value})...")
         
         # Step 1: Conduct research
-        if not self.test_mode:
-            print("\n🔄 Gathering project information...")
-        research = await self.research_agent.research_project(project_name, project_type)
+        if research is None:
+            if not self.test_mode:
+                print("\n🔄 Gathering project information...")
+            research = await self.research_agent.research_project(project_name, project_type)
         
         # Step 2: Get analyses from all analysts
         if not self.test_mode:
             print("\n📊 Analyzing findings with different risk profiles...")
-        analyses = {}
-        for style, analyst in self.analysts.items():
-            if not self.test_mode:
+        if not self.test_mode:
+            for analyst in self.analysts.values():
                 print(f"   - {analyst.name} is reviewing...")
-            analysis = analyst.analyze(research.summary)
-            analyses[style] = analysis.dict()
+        completed = {style: analysis async for style, analysis in self.iter_analyses(research.summary)}
+        # Reports list analysts in self.analysts order, not completion order
+        analyses = {style: completed[style] for style in self.analysts}
         
         # Step 3: Generate final recommendation
         final_verdict = self._generate_final_verdict(analyses)
@@ -152,15 +323,33 @@ class ResearchPipeline:
         
         return result
     
+    async def iter_analyses(self, summary: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Run every analyst on a summary and yield results as they finish.
+        
+        The reviews are CPU-bound and run inline on the event loop; callers
+        can still show each (style, analysis) pair as soon as it is ready.
+        """
+        async def _review(style: str, analyst: BaseAnalystAgent) -> Tuple[str, Dict]:
+            return style, (await _analyze_cached(analyst, summary)).dict()
+        
+        for review in asyncio.as_completed([
+            _review(style, analyst) for style, analyst in self.analysts.items()
+        ]):
+            yield await review
+    
     def _generate_final_verdict(self, analyses: Dict) -> Dict:
         """Generate a final verdict based on all analyses."""
-        # Count votes
-        votes = sum(1 for a in analyses.values() if a['vote'])
+        # Pack the panel into one record array and reduce each column
         total = len(analyses)
-        
-        # Calculate average risk score
-        avg_risk = sum(a['risk_score'] for a in analyses.values()) / total
-        avg_confidence = sum(a['confidence'] for a in analyses.values()) / total
+        panel = np.fromiter(
+            ((a['vote'], a['risk_score'], a['confidence']) for a in analyses.values()),
+            dtype=_VERDICT_DTYPE,
+            count=total
+        )
+        votes = int(panel['vote'].sum())
+        avg_risk = float(panel['risk_score'].mean())
+        avg_confidence = float(panel['confidence'].mean())
         
         # Determine overall recommendation
         recommendation = 'APPROVE' if votes > total / 2 else 'REJECT'
@@ -182,95 +371,74 @@ class ResearchPipeline:
     @classmethod
     def print_report(cls, results: Dict):
         """Print a formatted report of the analysis with enhanced details."""
-        print("\n" + "="*80)
-        print(f"📈 FINAL RESEARCH REPORT: {results['project'].upper()}")
-        print("="*80)
+        # Collect the report and write it in one go so it can't interleave
+        # with other output
+        lines = []
+        emit = lines.append
+        emit("\n" + "="*80)
+        emit(f"📈 FINAL RESEARCH REPORT: {results['project'].upper()}")
+        emit("="*80)
         
         # Print report metadata
         timestamp = cls._format_timestamp(results['timestamp'])
-        print(f"\n📅 Report Generated: {timestamp}")
+        emit(f"\n📅 Report Generated: {timestamp}")
         
         # Enhanced research summary parsing
-        print("\n🔍 DETAILED RESEARCH SUMMARY")
-        print("-" * 80)
+        emit("\n🔍 DETAILED RESEARCH SUMMARY")
+        emit("-" * 80)
         
         # Parse and display the research summary with better formatting
-        summary_lines = results['research_summary'].split('\n')
-        current_section = None
-        
-        for line in summary_lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Handle section headers
-            if line.startswith('## '):
-                current_section = line[3:].strip()
-                print(f"\n{' ' + current_section.upper() + ' ':-^80}")
-            # Handle sub-sections
-            elif line.startswith('### '):
-                print(f"\n{line[4:].upper()}")
-                print("-" * len(line[4:]))
-            # Handle list items
-            elif line.startswith('- '):
-                print(f"  • {line[2:]}")
-            # Regular text
-            else:
-                # Simple word wrap for long lines
-                import textwrap
-                for wrapped_line in textwrap.wrap(line, width=78):
-                    print(f"  {wrapped_line}")
+        lines.extend(_render_summary(results['research_summary']))
         
         # Print analyst reports with enhanced formatting
-        print("\n📊 ANALYST RECOMMENDATIONS")
-        print("-" * 80)
+        emit("\n📊 ANALYST RECOMMENDATIONS")
+        emit("-" * 80)
         
         for style, analysis in results['analyses'].items():
-            print(f"\n{' ' + style.upper() + ' ANALYST ':-^80}")
-            print(f"🔍 Risk Assessment: {analysis['risk_score']:.1f}/10")
-            print(f"📊 Verdict: {'✅ APPROVE' if analysis['vote'] else '❌ REJECT'}")
-            print(f"💎 Confidence: {analysis['confidence']*100:.0f}%")
+            emit(f"\n{' ' + style.upper() + ' ANALYST ':-^80}")
+            emit(f"🔍 Risk Assessment: {analysis['risk_score']:.1f}/10")
+            emit(f"📊 Verdict: {'✅ APPROVE' if analysis['vote'] else '❌ REJECT'}")
+            emit(f"💎 Confidence: {analysis['confidence']*100:.0f}%")
             
             # Format justification with better readability
-            print("\n📝 Detailed Analysis:")
+            emit("\n📝 Detailed Analysis:")
             for part in analysis['justification'].split('\n'):
                 if part.strip() == '':
                     continue
-                if part.endswith(':'):
-                    print(f"\n{part}")
-                elif part.startswith('✅') or part.startswith('⚠️') or part.startswith('❌'):
-                    print(f"\n{part}")
+                if part.endswith(':') or part.startswith(_VERDICT_MARKS):
+                    emit(f"\n{part}")
                 elif part.startswith('-'):
-                    print(f"  • {part[1:].strip()}")
+                    emit(f"  • {part[1:].strip()}")
                 else:
-                    print(f"  {part}")
+                    emit(f"  {part}")
         
         # Enhanced final verdict
         verdict = results['final_verdict']
-        print("\n🎯 FINAL VERDICT")
-        print("-" * 80)
+        emit("\n🎯 FINAL VERDICT")
+        emit("-" * 80)
         
         if verdict['recommendation'] == 'APPROVE':
-            print("✅ RECOMMENDATION: APPROVE")
-            print("   This project meets the criteria for consideration based on the analysis.")
+            emit("✅ RECOMMENDATION: APPROVE")
+            emit("   This project meets the criteria for consideration based on the analysis.")
         else:
-            print("❌ RECOMMENDATION: REJECT")
-            print("   This project does not meet the minimum criteria for approval.")
+            emit("❌ RECOMMENDATION: REJECT")
+            emit("   This project does not meet the minimum criteria for approval.")
             
-        print(f"\n📊 Consensus: {verdict['approval_rate']} analysts in favor")
-        print(f"📈 Average Risk Score: {verdict['average_risk_score']}/10")
-        print(f"💎 Average Confidence: {verdict['average_confidence']*100:.0f}%")
+        emit(f"\n📊 Consensus: {verdict['approval_rate']} analysts in favor")
+        emit(f"📈 Average Risk Score: {verdict['average_risk_score']}/10")
+        emit(f"💎 Average Confidence: {verdict['average_confidence']*100:.0f}%")
         
         # Additional context based on risk level
         avg_risk = float(verdict['average_risk_score'])
         if avg_risk < 3:
-            print("\n💡 This project is considered low risk with strong fundamentals.")
+            emit("\n💡 This project is considered low risk with strong fundamentals.")
         elif avg_risk < 7:
-            print("\n⚠️  This project carries moderate risk. Please review the analysis carefully.")
+            emit("\n⚠️  This project carries moderate risk. Please review the analysis carefully.")
         else:
-            print("\n🚨 This project is considered high risk. Exercise extreme caution and conduct additional due diligence.")
+            emit("\n🚨 This project is considered high risk. Exercise extreme caution and conduct additional due diligence.")
             
-        print("\n" + "="*80 + "\n")
+        emit("\n" + "="*80 + "\n")
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def parse_arguments():
@@ -357,43 +525,60 @@ Tokenomics: 1B total supply. 40% community incentives, 25% team (4-year vesting)
     }
 }
 
+def _write_report(results: Dict) -> str:
+    """Save the full results of an analysis as JSON and return the filename."""
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    filename = f"research_{results['project'].lower().replace(' ', '_')}_{timestamp}.json"
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    return filename
+
+def _print_saved_report(results: Dict, filename: str):
+    """Print the report for a finished analysis and where it was saved."""
+    ResearchPipeline.print_report(results)
+    print(f"\n📄 Full report saved to: {filename}")
+
 async def run_analysis(project_name: str, project_type: ProjectType, test_mode: bool = False, test_data: Optional[Dict] = None):
     """Run the analysis pipeline for a single project."""
     pipeline = ResearchPipeline(test_mode=test_mode, test_data=test_data)
     results = await pipeline.analyze_project(project_name, project_type)
-    
-    # Print and save results
-    pipeline.print_report(results)
-    
-    # Save full results to file
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"research_{project_name.lower().replace(' ', '_')}_{timestamp}.json"
-    with open(filename, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    print(f"\n📄 Full report saved to: {filename}")
+    # Keep the disk write off the event loop thread
+    filename = await asyncio.to_thread(_write_report, results)
+    _print_saved_report(results, filename)
     return results
 
-async def run_all_tests():
-    """Run all test cases."""
+async def run_all_tests(max_workers: int = 3):
+    """Run all test cases.
+    
+    Args:
+        max_workers: Maximum number of projects analysed at the same time
+    """
     print("🚀 Running all test cases...\n")
-    results = []
+    semaphore = asyncio.Semaphore(max_workers)
     
-    for project_name, data in SAMPLE_TEST_DATA.items():
+    async def _analyze(project_name: str, data: Dict) -> Dict:
+        async with semaphore:
+            pipeline = ResearchPipeline(test_mode=True, test_data=SAMPLE_TEST_DATA)
+            return await pipeline.analyze_project(project_name, _project_type(data['type']))
+    
+    results = await asyncio.gather(*(
+        _analyze(project_name, data) for project_name, data in SAMPLE_TEST_DATA.items()
+    ))
+    
+    # Write all reports in parallel worker threads, then print them in
+    # order so concurrent runs don't interleave output
+    filenames = await asyncio.gather(*(
+        asyncio.to_thread(_write_report, result) for result in results
+    ))
+    for i, (result, filename) in enumerate(zip(results, filenames)):
         print(f"\n{'='*80}")
-        print(f"🧪 TESTING: {project_name}")
+        print(f"🧪 TESTING: {result['project']}")
         print(f"{'='*80}")
         
-        result = await run_analysis(
-            project_name=project_name,
-            project_type=ProjectType(data['type']),
-            test_mode=True,
-            test_data=SAMPLE_TEST_DATA
-        )
-        results.append(result)
+        _print_saved_report(result, filename)
         
         # Add spacing between tests
-        if project_name != list(SAMPLE_TEST_DATA.keys())[-1]:
+        if i < len(results) - 1:
             print("\n" + "="*120 + "\n")
     
     # Print summary
@@ -411,75 +596,100 @@ async def run_all_tests():
     return results
 
 
-def process_proposal(proposal: Dict[str, Any], test_mode: Optional[bool] = None) -> Dict[str, Any]:
+def process_proposal(proposal: Dict[str, Any], test_mode: Optional[bool] = None,
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
     """
     Public, idempotent hook to run a proposal through the research pipeline.
 
     Args:
         proposal: Proposal payload (expects 'title' and metadata dict)
         test_mode: Optional override for pipeline test mode (defaults to env)
+        timeout: Seconds to wait for the pipeline (defaults to PIPELINE_TIMEOUT)
 
     Returns:
         Proposal dict with research results attached under reserved metadata key.
-        On failure, returns the original proposal unchanged (fail-open).
+        On failure or timeout, returns the original proposal unchanged (fail-open).
+
+    Raises:
+        RuntimeError: If called from the pipeline's own background loop, where
+            waiting on the loop would deadlock it
     """
     if not isinstance(proposal, dict):
         return proposal
 
-    proposal_copy = copy.deepcopy(proposal)
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is not None and running_loop is _BG_LOOP:
+        raise RuntimeError(
+            "process_proposal() cannot be called from the research pipeline loop; "
+            "await ResearchPipeline.analyze_project() there instead"
+        )
+
+    # Only the metadata dict and its research bucket are mutated below, so
+    # shallow-copy just that path instead of deep-copying the whole payload
+    proposal_copy = dict(proposal)
+    # "metadata" wins when both keys are present; the legacy key is only
+    # probed when it is missing
     metadata_key = (
-        "metadata"
-        if "metadata" in proposal_copy
-        else "proposal_metadata"
-        if "proposal_metadata" in proposal_copy
+        "proposal_metadata"
+        if "metadata" not in proposal_copy and "proposal_metadata" in proposal_copy
         else "metadata"
     )
-    metadata = copy.deepcopy(proposal_copy.get(metadata_key) or {})
+    metadata = dict(proposal_copy.get(metadata_key) or {})
 
     existing_research = metadata.get(RESEARCH_METADATA_KEY, {})
     if isinstance(existing_research, dict) and existing_research.get("tag") == RESEARCH_PIPELINE_TAG:
         proposal_copy[metadata_key] = metadata
         return proposal_copy
+    # Research bucket we write into, or None if the key holds a non-dict value
+    research_md = metadata.setdefault(RESEARCH_METADATA_KEY, {})
+    if isinstance(research_md, dict):
+        research_md = metadata[RESEARCH_METADATA_KEY] = dict(research_md)
+    else:
+        research_md = None
 
     resolved_test_mode = PIPELINE_TEST_MODE if test_mode is None else bool(test_mode)
 
     project_name = proposal_copy.get("title") or metadata.get("startup_name") or "Unknown Project"
-    project_type_str = metadata.get("project_type") or metadata.get("sector") or ProjectType.TECH_STARTUP.value
-    project_type = (
-        ProjectType(project_type_str)
-        if project_type_str in ProjectType._value2member_map_
-        else ProjectType.TECH_STARTUP
-    )
+    project_type_str = metadata.get("project_type") or metadata.get("sector")
+    project_type = _PROJECT_TYPE_MAP.get(project_type_str, _DEFAULT_PROJECT_TYPE)
+
+    # Analysts only hold their name and risk bias, so one set is safe to share
+    pipeline = _shared_pipeline(resolved_test_mode)
+
+    async def _analyze() -> Dict[str, Any]:
+        research = await _research_cached(pipeline, project_name, project_type)
+        return await pipeline.analyze_project(project_name, project_type, research=research)
 
-    pipeline = ResearchPipeline(test_mode=resolved_test_mode)
+    wait = PIPELINE_TIMEOUT if timeout is None else timeout
 
     def _run_pipeline() -> Dict[str, Any]:
-        loop = asyncio.new_event_loop()
+        future = asyncio.run_coroutine_threadsafe(_analyze(), _background_loop())
         try:
-            asyncio.set_event_loop(loop)
-            return loop.run_until_complete(pipeline.analyze_project(project_name, project_type))
-        finally:
-            loop.close()
+            return future.result(timeout=wait)
+        except TimeoutError:
+            # Stop the hung run on the loop so it doesn't pile up behind new ones
+            future.cancel()
+            raise TimeoutError(f"research pipeline timed out after {wait}s") from None
 
     try:
         analysis = _run_pipeline()
     except Exception as exc:
         # Fail-open: preserve original proposal and record error under reserved metadata
-        metadata.setdefault(RESEARCH_METADATA_KEY, {})
-        if isinstance(metadata[RESEARCH_METADATA_KEY], dict):
-            errors = metadata[RESEARCH_METADATA_KEY].get("errors", [])
-            errors.append(str(exc))
-            metadata[RESEARCH_METADATA_KEY]["errors"] = errors
+        if research_md is not None:
+            research_md["errors"] = [*research_md.get("errors", []), str(exc)]
         proposal_copy[metadata_key] = metadata
         return proposal_copy
 
-    metadata.setdefault(RESEARCH_METADATA_KEY, {})
-    if isinstance(metadata[RESEARCH_METADATA_KEY], dict):
-        metadata[RESEARCH_METADATA_KEY].update(
+    if research_md is not None:
+        research_md.update(
             {
                 "tag": RESEARCH_PIPELINE_TAG,
                 "analysis": analysis,
-                "updated_at": datetime.utcnow().isoformat(),
+                # The pipeline already stamped this run; reuse it
+                "updated_at": analysis["metadata"]["analysis_timestamp"],
                 "test_mode": resolved_test_mode,
             }
         )
@@ -4,26 +4,154 @@ Handles LLM calls, PDF generation, IPFS upload, and backend submission.
 """
 
 import os
+import asyncio
 import json
 import logging
+import threading
+import weakref
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from jinja2 import Template
-from typing import Dict, Any
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Dict, Any, List, Optional, Tuple
+import functools
 import hashlib
+import io
 import time
 import re
 import shutil
 import subprocess
 import tempfile
 import base64
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+
+from storacha_cid import BARE_CID_RE, STORACHA_LINK_CID_RE
 
 logger = logging.getLogger(__name__)
 
 DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
 
+TEMPLATE_DIR = Path(__file__).parent
+
+# Templates are compiled once and reused; they ship with the package, so
+# there is no need to stat them for changes on every render
+_TEMPLATE_ENV = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False
+)
+
+# Block size for hashing uploads
+HASH_CHUNK_SIZE = 1 << 16
+
+# Directory for the on-disk deal memo cache; caching is off when unset
+MEMO_CACHE_DIR = os.getenv("MEMO_CACHE_DIR")
+
+# Cap on concurrent async LLM requests, to stay under provider rate limits
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Where Batch API jobs remember which startup each request belongs to. Jobs
+# are collected up to 24h later, possibly from another working directory,
+# so the default lives in the user cache rather than next to the caller
+MEMO_BATCH_DIR = os.getenv("MEMO_BATCH_DIR") or str(
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "smartboard" / "memo_batches")
+
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_FILES_URL = "https://api.openai.com/v1/files"
+OPENAI_BATCHES_URL = "https://api.openai.com/v1/batches"
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+
+# (connect, read) timeouts: fail fast on unreachable hosts, but give the
+# provider enough time to generate a full memo
+LLM_TIMEOUT = (5.0, 60.0)
+BACKEND_TIMEOUT = (5.0, 30.0)
+
+# Provider rate-limit and transient server errors worth retrying
+LLM_RETRY_TOTAL = 5
+LLM_RETRY_BACKOFF = 0.5
+LLM_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _build_session() -> requests.Session:
+    """
+    Build the shared HTTP session so keep-alive connections (and their TLS
+    handshakes) are reused across memo runs.
+
+    LLM endpoints additionally retry rate-limit and gateway errors; backend
+    submissions are not retried so a memo is never submitted twice.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    llm_adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=LLM_RETRY_TOTAL,
+            backoff_factor=LLM_RETRY_BACKOFF,
+            status_forcelist=LLM_RETRY_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount(OPENAI_URL, llm_adapter)
+    session.mount(ANTHROPIC_URL, llm_adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+# httpx.AsyncClient pools are bound to the loop they first run on, so keep
+# one client per event loop; entries go away with their loop
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _async_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        # With an explicit transport httpx ignores client-level limits, so
+        # the pool size goes on the transport itself
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT[1], connect=LLM_TIMEOUT[0]),
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                retries=LLM_RETRY_TOTAL
+            )
+        )
+        _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+_LLM_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
 
-def llm_call(prompt: str, system_prompt: str = None) -> str:
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    """Return the LLM concurrency limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _LLM_SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = _LLM_SEMAPHORES[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return semaphore
+
+
+def _llm_settings():
+    """Return (provider, api_key, model) from the environment."""
+    provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    api_key = os.getenv("OPENAI_API_KEY")
+    model = os.getenv("LLM_MODEL", "gpt-4")
+    return provider, api_key, model
+
+
+def llm_call(prompt: str, system_prompt: str = None, stop_after_json: bool = False) -> str:
     """
     Call LLM provider (OpenAI, Anthropic, etc.) with the given prompt.
     Abstracted for easy swapping/mocking.
@@ -31,13 +159,13 @@ def llm_call(prompt: str, system_prompt: str = None) -> str:
     Args:
         prompt: User prompt
         system_prompt: Optional system prompt
+        stop_after_json: Return as soon as a streamed response has produced
+            one complete JSON object, skipping any trailing text
 
     Returns:
         LLM response text
     """
-    provider = os.getenv("LLM_PROVIDER", "openai").lower()
-    api_key = os.getenv("OPENAI_API_KEY")
-    model = os.getenv("LLM_MODEL", "gpt-4")
+    provider, api_key, model = _llm_settings()
 
     if not api_key:
         logger.warning("No LLM API key found, using simulated response")
@@ -45,22 +173,87 @@ def llm_call(prompt: str, system_prompt: str = None) -> str:
 
     try:
         if provider == "openai":
-            return _call_openai(prompt, system_prompt, api_key, model)
+            return _call_openai(prompt, system_prompt, api_key, model, stop_after_json)
         elif provider == "anthropic":
             return _call_anthropic(prompt, system_prompt, api_key, model)
         else:
             logger.warning(
-                f"Unknown LLM provider: {provider}, using simulation")
+                "Unknown LLM provider: %s, using simulation", provider)
             return _simulated_llm_response(prompt)
-    except Exception as e:
-        logger.error(f"LLM call failed: {e}")
+    # ValueError covers JSON decode errors; KeyError/IndexError/TypeError a
+    # response body that doesn't have the shape the provider documents
+    except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.error("LLM call failed: %s", e)
         logger.warning("Falling back to simulated response")
         return _simulated_llm_response(prompt)
 
 
-def _call_openai(prompt: str, system_prompt: str, api_key: str, model: str) -> str:
-    """Call OpenAI API."""
-    url = "https://api.openai.com/v1/chat/completions"
+async def allm_call(prompt: str, system_prompt: str = None) -> str:
+    """
+    Async variant of llm_call, so several prompts can be in flight at once.
+
+    Args:
+        prompt: User prompt
+        system_prompt: Optional system prompt
+
+    Returns:
+        LLM response text
+    """
+    provider, api_key, model = _llm_settings()
+
+    if not api_key:
+        logger.warning("No LLM API key found, using simulated response")
+        return _simulated_llm_response(prompt)
+
+    try:
+        if provider == "openai":
+            async with _llm_semaphore():
+                return await _acall_openai(prompt, system_prompt, api_key, model)
+        elif provider == "anthropic":
+            async with _llm_semaphore():
+                return await _acall_anthropic(prompt, system_prompt, api_key, model)
+        else:
+            logger.warning(
+                "Unknown LLM provider: %s, using simulation", provider)
+            return _simulated_llm_response(prompt)
+    except (httpx.HTTPError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.error("LLM call failed: %s", e)
+        logger.warning("Falling back to simulated response")
+        return _simulated_llm_response(prompt)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying, honouring a Retry-After header."""
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return LLM_RETRY_BACKOFF * (2 ** attempt)
+
+
+async def _apost_llm(url: str, headers: Dict[str, str], data: Dict[str, Any]) -> httpx.Response:
+    """
+    POST to an LLM endpoint, retrying rate-limit and transient server errors
+    with exponential backoff, like the Retry policy on the sync session.
+    """
+    client = _async_client()
+    for attempt in range(LLM_RETRY_TOTAL):
+        response = await client.post(url, headers=headers, json=data)
+        if response.status_code not in LLM_RETRY_STATUSES:
+            break
+        delay = _retry_delay(response, attempt)
+        logger.warning("LLM returned %d, retrying in %.1fs", response.status_code, delay)
+        await asyncio.sleep(delay)
+    else:
+        response = await client.post(url, headers=headers, json=data)
+    response.raise_for_status()
+    return response
+
+
+def _openai_request(prompt: str, system_prompt: str, api_key: str, model: str):
+    """Build the (headers, body) pair for an OpenAI chat completion."""
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
@@ -76,16 +269,11 @@ def _call_openai(prompt: str, system_prompt: str, api_key: str, model: str) -> s
         "messages": messages,
         "temperature": 0.7
     }
-
-    response = requests.post(url, headers=headers, json=data, timeout=60)
-    response.raise_for_status()
-
-    return response.json()["choices"][0]["message"]["content"]
+    return headers, data
 
 
-def _call_anthropic(prompt: str, system_prompt: str, api_key: str, model: str) -> str:
-    """Call Anthropic API."""
-    url = "https://api.anthropic.com/v1/messages"
+def _anthropic_request(prompt: str, system_prompt: str, api_key: str, model: str):
+    """Build the (headers, body) pair for an Anthropic message."""
     headers = {
         "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
@@ -100,11 +288,189 @@ def _call_anthropic(prompt: str, system_prompt: str, api_key: str, model: str) -
 
     if system_prompt:
         data["system"] = system_prompt
+    return headers, data
+
 
-    response = requests.post(url, headers=headers, json=data, timeout=60)
+class _JsonObjectScanner:
+    """
+    Incrementally track brace depth over streamed text, ignoring braces
+    inside JSON strings, to tell when the first top-level object is complete.
+    """
+
+    __slots__ = ("depth", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """Consume text; return True once the first object has closed."""
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == "{":
+                self.depth += 1
+            elif self.depth:
+                if ch == '"':
+                    self.in_string = True
+                elif ch == "}":
+                    self.depth -= 1
+                    if not self.depth:
+                        return True
+        return False
+
+
+def _call_openai(prompt: str, system_prompt: str, api_key: str, model: str,
+                 stop_after_json: bool = False) -> str:
+    """
+    Call OpenAI API, streaming the completion.
+
+    Deltas are accumulated as they arrive; with stop_after_json the stream is
+    closed as soon as the first JSON object in the output is complete.
+    """
+    headers, data = _openai_request(prompt, system_prompt, api_key, model)
+    data["stream"] = True
+
+    response = _SESSION.post(OPENAI_URL, headers=headers, json=data, timeout=LLM_TIMEOUT, stream=True)
+    try:
+        response.raise_for_status()
+
+        parts = []
+        scanner = _JsonObjectScanner() if stop_after_json else None
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == b"[DONE]":
+                break
+            choices = orjson.loads(payload)["choices"]
+            delta = choices[0]["delta"].get("content") if choices else None
+            if not delta:
+                continue
+            parts.append(delta)
+            if scanner is not None and scanner.feed(delta):
+                break
+        return "".join(parts)
+    finally:
+        response.close()
+
+
+def _call_anthropic(prompt: str, system_prompt: str, api_key: str, model: str) -> str:
+    """Call Anthropic API."""
+    headers, data = _anthropic_request(prompt, system_prompt, api_key, model)
+
+    response = _SESSION.post(ANTHROPIC_URL, headers=headers, json=data, timeout=LLM_TIMEOUT)
     response.raise_for_status()
 
-    return response.json()["content"][0]["text"]
+    return orjson.loads(response.content)["content"][0]["text"]
+
+
+async def _acall_openai(prompt: str, system_prompt: str, api_key: str, model: str) -> str:
+    """Call OpenAI API without blocking the event loop."""
+    headers, data = _openai_request(prompt, system_prompt, api_key, model)
+
+    response = await _apost_llm(OPENAI_URL, headers, data)
+
+    return orjson.loads(response.content)["choices"][0]["message"]["content"]
+
+
+async def _acall_anthropic(prompt: str, system_prompt: str, api_key: str, model: str) -> str:
+    """Call Anthropic API without blocking the event loop."""
+    headers, data = _anthropic_request(prompt, system_prompt, api_key, model)
+
+    response = await _apost_llm(ANTHROPIC_URL, headers, data)
+
+    return orjson.loads(response.content)["content"][0]["text"]
+
+
+# Canned memo for demo mode. Only the two scores vary per startup, so the
+# rest is serialized once at import and the scores are spliced in per call.
+_SIM_SCORE = "__SIM_SCORE__"
+_SIM_RESPONSE_DICT = {
+    "executive_summary": "NexGenAI presents a compelling investment opportunity in the rapidly growing enterprise AI automation market. The company's proprietary algorithms offer significant performance advantages, reducing training time by 70% while maintaining accuracy. With a strong founding team from Google AI Research and MIT, along with early traction showing 15% monthly growth, the company is well-positioned to capture market share. However, the competitive landscape is intense, and execution risks remain.",
+
+    "investment_thesis": "The enterprise AI automation market is projected to reach $15B by 2027, representing a significant opportunity. NexGenAI's differentiated technology and AI-first approach provide a competitive moat against traditional RPA players. The founding team's deep expertise in AI research and their early customer validation demonstrate strong product-market fit potential. The company's capital efficient growth (15% MRR growth with 18 months runway) indicates prudent management and scalability.",
+
+    "swot": {
+        "strengths": [
+            "Proprietary AI algorithms with 70% efficiency improvement",
+            "World-class founding team (ex-Google AI, MIT PhD, ex-OpenAI)",
+            "Strong early traction: $50K MRR with 15% monthly growth",
+            "AI-first approach vs. traditional RPA incumbents",
+            "18-month runway provides adequate time for execution"
+        ],
+        "weaknesses": [
+            "Small customer base (12 customers) indicates early stage",
+            "Limited brand recognition in established market",
+            "Dependency on AI infrastructure costs",
+            "Need to scale sales and marketing capabilities"
+        ],
+        "opportunities": [
+            "Rapidly expanding enterprise AI market ($15B by 2027)",
+            "Increasing enterprise adoption of AI automation",
+            "Potential for horizontal expansion to adjacent markets",
+            "Strategic partnerships with cloud providers",
+            "International expansion opportunities"
+        ],
+        "threats": [
+            "Intense competition from well-funded incumbents (UiPath, Automation Anywhere)",
+            "Potential market saturation in enterprise automation",
+            "Rapid technological change could obsolete current approach",
+            "Economic downturn could reduce enterprise AI spending",
+            "Regulatory risks around AI usage"
+        ]
+    },
+
+    "risks": [
+        {
+            "category": "Market Risk",
+            "description": "Competition from established players with deeper pockets",
+            "severity": "High",
+            "mitigation": "Focus on differentiation through AI-first approach and faster iteration"
+        },
+        {
+            "category": "Execution Risk",
+            "description": "Ability to scale from 12 to 100+ customers",
+            "severity": "Medium",
+            "mitigation": "30% of funding allocated to sales & marketing expansion"
+        },
+        {
+            "category": "Technology Risk",
+            "description": "Maintaining performance advantage as competitors catch up",
+            "severity": "Medium",
+            "mitigation": "60% of funding allocated to continued R&D"
+        },
+        {
+            "category": "Team Risk",
+            "description": "Need to hire and retain top AI talent",
+            "severity": "Medium",
+            "mitigation": "Strong employer brand from founder backgrounds"
+        }
+    ],
+
+    "risk_score": _SIM_SCORE,
+    "confidence_score": _SIM_SCORE,
+
+    "recommendation": "INVEST with cautious optimism. NexGenAI demonstrates strong technical foundations and promising early traction. The $5M ask at $20M valuation is reasonable given current metrics and market opportunity. However, close monitoring of customer acquisition costs, retention metrics, and competitive positioning is essential. Recommend staged investment with milestones tied to customer growth targets.",
+
+    "key_metrics_to_track": [
+        "MRR growth rate (target: maintain >10% monthly)",
+        "Customer acquisition cost and payback period",
+        "Net revenue retention (target: >100%)",
+        "Product development velocity",
+        "Competitive win/loss analysis"
+    ]
+}
+_SIM_RISK_PREFIX, _SIM_SCORE_SEPARATOR, _SIM_CONFIDENCE_SUFFIX = (
+    orjson.dumps(_SIM_RESPONSE_DICT).decode().split(f'"{_SIM_SCORE}"')
+)
+_STARTUP_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]+)"')
 
 
 def _simulated_llm_response(prompt: str) -> str:
@@ -118,93 +484,57 @@ def _simulated_llm_response(prompt: str) -> str:
     
     try:
         # Try to find startup data in prompt
-        import re
-        startup_match = re.search(r'"name"\s*:\s*"([^"]+)"', prompt)
+        startup_match = _STARTUP_NAME_RE.search(prompt)
         if startup_match:
             startup_name = startup_match.group(1)
             # Vary confidence based on startup name hash (deterministic but varied)
             name_hash = hash(startup_name) % 100
             confidence = 60 + (name_hash % 30)  # Range: 60-89
             risk_score = 100 - confidence + 20  # Inverse relationship
-            logger.debug(f"Simulated confidence for {startup_name}: {confidence}")
+            logger.debug("Simulated confidence for %s: %d", startup_name, confidence)
     except Exception:
         pass  # Use defaults if extraction fails
     
-    return json.dumps({
-        "executive_summary": "NexGenAI presents a compelling investment opportunity in the rapidly growing enterprise AI automation market. The company's proprietary algorithms offer significant performance advantages, reducing training time by 70% while maintaining accuracy. With a strong founding team from Google AI Research and MIT, along with early traction showing 15% monthly growth, the company is well-positioned to capture market share. However, the competitive landscape is intense, and execution risks remain.",
-
-        "investment_thesis": "The enterprise AI automation market is projected to reach $15B by 2027, representing a significant opportunity. NexGenAI's differentiated technology and AI-first approach provide a competitive moat against traditional RPA players. The founding team's deep expertise in AI research and their early customer validation demonstrate strong product-market fit potential. The company's capital efficient growth (15% MRR growth with 18 months runway) indicates prudent management and scalability.",
-
-        "swot": {
-            "strengths": [
-                "Proprietary AI algorithms with 70% efficiency improvement",
-                "World-class founding team (ex-Google AI, MIT PhD, ex-OpenAI)",
-                "Strong early traction: $50K MRR with 15% monthly growth",
-                "AI-first approach vs. traditional RPA incumbents",
-                "18-month runway provides adequate time for execution"
-            ],
-            "weaknesses": [
-                "Small customer base (12 customers) indicates early stage",
-                "Limited brand recognition in established market",
-                "Dependency on AI infrastructure costs",
-                "Need to scale sales and marketing capabilities"
-            ],
-            "opportunities": [
-                "Rapidly expanding enterprise AI market ($15B by 2027)",
-                "Increasing enterprise adoption of AI automation",
-                "Potential for horizontal expansion to adjacent markets",
-                "Strategic partnerships with cloud providers",
-                "International expansion opportunities"
-            ],
-            "threats": [
-                "Intense competition from well-funded incumbents (UiPath, Automation Anywhere)",
-                "Potential market saturation in enterprise automation",
-                "Rapid technological change could obsolete current approach",
-                "Economic downturn could reduce enterprise AI spending",
-                "Regulatory risks around AI usage"
-            ]
-        },
+    return f"{_SIM_RISK_PREFIX}{risk_score}{_SIM_SCORE_SEPARATOR}{confidence}{_SIM_CONFIDENCE_SUFFIX}"
 
-        "risks": [
-            {
-                "category": "Market Risk",
-                "description": "Competition from established players with deeper pockets",
-                "severity": "High",
-                "mitigation": "Focus on differentiation through AI-first approach and faster iteration"
-            },
-            {
-                "category": "Execution Risk",
-                "description": "Ability to scale from 12 to 100+ customers",
-                "severity": "Medium",
-                "mitigation": "30% of funding allocated to sales & marketing expansion"
-            },
-            {
-                "category": "Technology Risk",
-                "description": "Maintaining performance advantage as competitors catch up",
-                "severity": "Medium",
-                "mitigation": "60% of funding allocated to continued R&D"
-            },
-            {
-                "category": "Team Risk",
-                "description": "Need to hire and retain top AI talent",
-                "severity": "Medium",
-                "mitigation": "Strong employer brand from founder backgrounds"
-            }
-        ],
 
-        "risk_score": risk_score,
-        "confidence_score": confidence,
+MEMO_SYSTEM_PROMPT = """You are an expert venture capital analyst specializing in early-stage technology investments. 
+Your task is to analyze startups and produce comprehensive investment memos with SWOT analysis, 
+investment thesis, risk assessment, and confidence scores. Be thorough, analytical, and balanced 
+in your assessments. Output your analysis in JSON format."""
+
 
-        "recommendation": "INVEST with cautious optimism. NexGenAI demonstrates strong technical foundations and promising early traction. The $5M ask at $20M valuation is reasonable given current metrics and market opportunity. However, close monitoring of customer acquisition costs, retention metrics, and competitive positioning is essential. Recommend staged investment with milestones tied to customer growth targets.",
+@functools.lru_cache(maxsize=None)
+def _prompt_template() -> str:
+    """Load the deal memo prompt template once."""
+    with open(TEMPLATE_DIR / "prompt_template.txt", "r") as f:
+        return f.read()
 
-        "key_metrics_to_track": [
-            "MRR growth rate (target: maintain >10% monthly)",
-            "Customer acquisition cost and payback period",
-            "Net revenue retention (target: >100%)",
-            "Product development velocity",
-            "Competitive win/loss analysis"
-        ]
-    })
+
+def _build_memo_prompt(startup_data: Dict[str, Any]) -> str:
+    """Format the deal memo prompt for a startup."""
+    return _prompt_template().format(
+        startup_json=orjson.dumps(
+            startup_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _batch_prompt_template() -> str:
+    """Load the multi-startup deal memo prompt template once."""
+    with open(TEMPLATE_DIR / "prompt_template_batch.txt", "r") as f:
+        return f.read()
+
+
+def _build_batch_memo_prompt(startups: List[Dict[str, Any]]) -> str:
+    """Format one prompt asking for a memo per startup, as a JSON array."""
+    return _batch_prompt_template().format(
+        count=len(startups),
+        startups_json=orjson.dumps(
+            startups, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    )
 
 
 def generate_deal_memo(startup_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -217,91 +547,398 @@ def generate_deal_memo(startup_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict with memo content including SWOT, thesis, risks, scores
     """
-    # Load prompt template
-    template_path = Path(__file__).parent / "prompt_template.txt"
-    with open(template_path, "r") as f:
-        prompt_template = f.read()
+    prompt = _build_memo_prompt(startup_data)
+    key = _memo_cache_key(prompt)
+    cached = _memo_cache_get(key)
+    if cached is not None:
+        return cached
+
+    response_text = llm_call(prompt, MEMO_SYSTEM_PROMPT, stop_after_json=True)
+    return _finish_memo(key, prompt, response_text)
+
+
+async def agenerate_deal_memo(startup_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async variant of generate_deal_memo.
+
+    Args:
+        startup_data: Dict containing startup information
+
+    Returns:
+        Dict with memo content including SWOT, thesis, risks, scores
+    """
+    prompt = _build_memo_prompt(startup_data)
+    key = _memo_cache_key(prompt)
+    cached = _memo_cache_get(key)
+    if cached is not None:
+        return cached
+
+    response_text = await allm_call(prompt, MEMO_SYSTEM_PROMPT)
+    return _finish_memo(key, prompt, response_text)
+
+
+async def abatch_generate_memos(startups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Generate deal memos for several startups concurrently.
+
+    Args:
+        startups: List of startup data dicts
+
+    Returns:
+        Memo contents in the same order as startups
+    """
+    loop = asyncio.get_running_loop()
+    owns_client = loop not in _ASYNC_CLIENTS
+    try:
+        return await asyncio.gather(*(agenerate_deal_memo(s) for s in startups))
+    finally:
+        # A client opened just for this batch (e.g. under asyncio.run) would
+        # otherwise leak its pooled connections when the loop is torn down;
+        # one the loop already had belongs to the caller
+        client = _ASYNC_CLIENTS.pop(loop, None) if owns_client else None
+        if client is not None:
+            await client.aclose()
+
+
+def batch_generate_memos(startups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Synchronous wrapper around abatch_generate_memos."""
+    return asyncio.run(abatch_generate_memos(startups))
+
+
+def generate_deal_memos_batch(startups: List[Dict[str, Any]], batch_size: int = 4) -> List[Dict[str, Any]]:
+    """
+    Generate deal memos with one LLM call per batch_size startups.
 
-    # Format prompt with startup data
-    prompt = prompt_template.format(
-        startup_json=json.dumps(startup_data, indent=2)
+    Each call shares a single system prompt and round-trip across the batch.
+    If a batch response is not a JSON array with one memo per startup, in
+    input order by startup_name, that batch falls back to one
+    generate_deal_memo call per startup.
+
+    Args:
+        startups: List of startup data dicts
+        batch_size: Startups per LLM call
+
+    Returns:
+        Memo contents in the same order as startups
+    """
+    batch_size = max(1, batch_size)
+    memos = []
+    for i in range(0, len(startups), batch_size):
+        chunk = startups[i:i + batch_size]
+        if len(chunk) == 1:
+            memos.append(generate_deal_memo(chunk[0]))
+            continue
+
+        response_text = llm_call(_build_batch_memo_prompt(chunk), MEMO_SYSTEM_PROMPT)
+        items = _extract_json_array(response_text)
+        if (
+            items is None
+            or len(items) != len(chunk)
+            or not all(_memo_matches_startup(item, s) for item, s in zip(items, chunk))
+        ):
+            logger.warning("Batch memo response unusable, generating %d memos individually", len(chunk))
+            memos.extend(generate_deal_memo(s) for s in chunk)
+            continue
+
+        memos.extend(_normalize_confidence_score(item) for item in items)
+    return memos
+
+
+def memo_batch_custom_id(startup_data: Dict[str, Any]) -> str:
+    """Stable Batch API request id for a startup: sha256 of its canonical JSON."""
+    canonical = orjson.dumps(startup_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def submit_memos_batch_api(startups: List[Dict[str, Any]]) -> str:
+    """
+    Queue deal memos on OpenAI's Batch API, for runs that can wait.
+
+    Batch jobs complete within 24 hours at a lower price than interactive
+    calls and don't count against the interactive rate limits. The job's
+    request ids are saved under MEMO_BATCH_DIR for collect_memos_batch_api.
+
+    Args:
+        startups: List of startup data dicts
+
+    Returns:
+        Batch job id
+    """
+    provider, api_key, model = _llm_settings()
+    if provider != "openai" or not api_key:
+        raise ValueError("The memo Batch API requires LLM_PROVIDER=openai and OPENAI_API_KEY")
+
+    custom_ids = [memo_batch_custom_id(s) for s in startups]
+    lines = []
+    seen = set()
+    for custom_id, startup in zip(custom_ids, startups):
+        # Identical startups share one request
+        if custom_id in seen:
+            continue
+        seen.add(custom_id)
+        _, data = _openai_request(_build_memo_prompt(startup), MEMO_SYSTEM_PROMPT, api_key, model)
+        lines.append(orjson.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": data
+        }))
+
+    auth = {"Authorization": f"Bearer {api_key}"}
+    response = _SESSION.post(
+        OPENAI_FILES_URL,
+        headers=auth,
+        data={"purpose": "batch"},
+        files={"file": ("memos.jsonl", b"\n".join(lines), "application/jsonl")},
+        timeout=LLM_TIMEOUT
+    )
+    response.raise_for_status()
+    input_file_id = orjson.loads(response.content)["id"]
+
+    response = _SESSION.post(
+        OPENAI_BATCHES_URL,
+        headers=auth,
+        json={
+            "input_file_id": input_file_id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h"
+        },
+        timeout=LLM_TIMEOUT
     )
+    response.raise_for_status()
+    job_id = orjson.loads(response.content)["id"]
 
-    system_prompt = """You are an expert venture capital analyst specializing in early-stage technology investments. 
-Your task is to analyze startups and produce comprehensive investment memos with SWOT analysis, 
-investment thesis, risk assessment, and confidence scores. Be thorough, analytical, and balanced 
-in your assessments. Output your analysis in JSON format."""
+    batch_dir = Path(MEMO_BATCH_DIR)
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    (batch_dir / f"{job_id}.json").write_bytes(orjson.dumps(custom_ids))
+    logger.info("Submitted %d memo requests as batch %s", len(lines), job_id)
+    return job_id
 
-    # Call LLM
-    response_text = llm_call(prompt, system_prompt)
 
-    # Parse JSON response
+def collect_memos_batch_api(job_id: str, wait: bool = False, poll_interval: float = 60.0) -> Optional[List[Optional[Dict[str, Any]]]]:
+    """
+    Collect the memos of a job started with submit_memos_batch_api.
+
+    Args:
+        job_id: Batch job id
+        wait: Poll until the job finishes instead of returning None
+        poll_interval: Seconds between polls when waiting
+
+    Returns:
+        Memo contents in submission order (None for requests that failed),
+        or None if the job is still running
+    """
+    _, api_key, _ = _llm_settings()
+    auth = {"Authorization": f"Bearer {api_key}"}
+
+    while True:
+        response = _SESSION.get(f"{OPENAI_BATCHES_URL}/{job_id}", headers=auth, timeout=LLM_TIMEOUT)
+        response.raise_for_status()
+        batch = orjson.loads(response.content)
+        status = batch["status"]
+        if status in ("completed", "failed", "expired", "cancelled"):
+            break
+        if not wait:
+            logger.info("Batch %s is %s", job_id, status)
+            return None
+        time.sleep(poll_interval)
+
+    output_file_id = batch.get("output_file_id")
+    if not output_file_id:
+        raise RuntimeError(f"Batch {job_id} ended as {status} with no output")
+
+    response = _SESSION.get(f"{OPENAI_FILES_URL}/{output_file_id}/content", headers=auth, timeout=LLM_TIMEOUT)
+    response.raise_for_status()
+
+    memos_by_id = {}
+    for line in response.content.splitlines():
+        if not line.strip():
+            continue
+        result = orjson.loads(line)
+        body = (result.get("response") or {}).get("body") or {}
+        try:
+            content = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError):
+            logger.warning("Batch request %s failed: %s", result.get("custom_id"), result.get("error"))
+            continue
+        memos_by_id[result["custom_id"]] = _parse_memo_response(content)
+
+    custom_ids = orjson.loads((Path(MEMO_BATCH_DIR) / f"{job_id}.json").read_bytes())
+    return [memos_by_id.get(custom_id) for custom_id in custom_ids]
+
+
+def _memo_matches_startup(memo: Dict[str, Any], startup_data: Dict[str, Any]) -> bool:
+    """True if a batched memo's startup_name names startup_data (case-insensitively)."""
+    name = startup_data.get("name")
+    if not name:
+        return True
+    return str(memo.get("startup_name", "")).strip().casefold() == str(name).strip().casefold()
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the first complete JSON object embedded in text, or None.
+
+    raw_decode stops at the end of the object, so prose after it (even
+    prose containing braces) is ignored, and no regex backtracking is involved.
+    """
+    start = text.find("{")
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            return obj
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+    return None
+
+
+def _extract_json_array(text: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return the reply's top-level JSON array of objects, or None.
+
+    Only a Markdown code fence may surround the array. An array found
+    further in (e.g. an object's "risks" list) is not the batch result.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rstrip()
+        if text.endswith("```"):
+            text = text[:-3]
+        text = text.strip()
+    if not text.startswith("["):
+        return None
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(text)
+    except json.JSONDecodeError:
+        return None
+    if not all(isinstance(item, dict) for item in obj):
+        return None
+    return obj
+
+
+def _parse_memo_response(response_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the LLM's memo JSON and normalize its confidence_score.
+
+    Returns None if the response is not valid JSON.
+    """
     try:
         # Try to extract JSON from response (handles cases where LLM adds text before/after)
-        import re
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
-            memo_content = json.loads(json_match.group())
-        else:
-            memo_content = json.loads(response_text)
+        memo_content = _extract_json_object(response_text)
+        if memo_content is None:
+            memo_content = orjson.loads(response_text)
         
-        # Validate and extract confidence_score with multiple fallback strategies
-        confidence_score = None
-        
-        # Strategy 1: Direct field
-        if "confidence_score" in memo_content:
-            confidence_score = memo_content["confidence_score"]
-        # Strategy 2: Alternative field names
-        elif "confidence" in memo_content:
-            confidence_score = memo_content["confidence"]
-        elif "confidenceScore" in memo_content:
-            confidence_score = memo_content["confidenceScore"]
-        # Strategy 3: Calculate from risk_score (inverse relationship)
-        elif "risk_score" in memo_content:
-            risk = memo_content.get("risk_score", 50)
-            # Scale: 0-100 risk -> 20-100 confidence (lower risk = higher confidence)
-            confidence_score = max(0, min(100, 100 - risk + 20))
-            logger.info(f"Calculated confidence_score from risk_score: {confidence_score}")
-        # Strategy 4: Extract from recommendation text
-        elif "recommendation" in memo_content:
-            rec_text = str(memo_content.get("recommendation", "")).upper()
-            if "INVEST" in rec_text and "STRONG" in rec_text:
-                confidence_score = 85
-            elif "INVEST" in rec_text:
-                confidence_score = 75
-            elif "WATCH" in rec_text:
-                confidence_score = 60
-            elif "PASS" in rec_text or "REJECT" in rec_text:
-                confidence_score = 40
-            else:
-                confidence_score = 70
-            logger.info(f"Derived confidence_score from recommendation text: {confidence_score}")
-        
-        # Validate and set confidence_score
-        if confidence_score is None:
-            logger.warning("Could not determine confidence_score, using default: 75")
-            confidence_score = 75
-        
-        # Ensure it's a valid integer in range
-        try:
-            conf = int(float(confidence_score))  # Handle string numbers
-            confidence_score = max(0, min(100, conf))  # Clamp to 0-100
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Invalid confidence_score format: {confidence_score}, using 75. Error: {e}")
-            confidence_score = 75
-        
-        memo_content["confidence_score"] = confidence_score
-        logger.info(f"Final confidence_score: {confidence_score}")
+        _normalize_confidence_score(memo_content)
         
     except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        logger.error(f"Response text (first 500 chars): {response_text[:500]}")
+        logger.error("Failed to parse LLM response as JSON: %s", e)
+        logger.error("Response text (first 500 chars): %.500s", response_text)
+        return None
+
+    return memo_content
+
+
+def _normalize_confidence_score(memo_content: Dict[str, Any]) -> Dict[str, Any]:
+    """Set memo_content["confidence_score"] to an int in 0-100 and return it."""
+    # Validate and extract confidence_score with multiple fallback strategies
+    confidence_score = None
+    
+    # Strategy 1: Direct field
+    if "confidence_score" in memo_content:
+        confidence_score = memo_content["confidence_score"]
+    # Strategy 2: Alternative field names
+    elif "confidence" in memo_content:
+        confidence_score = memo_content["confidence"]
+    elif "confidenceScore" in memo_content:
+        confidence_score = memo_content["confidenceScore"]
+    # Strategy 3: Calculate from risk_score (inverse relationship)
+    elif "risk_score" in memo_content:
+        risk = memo_content.get("risk_score", 50)
+        # Scale: 0-100 risk -> 20-100 confidence (lower risk = higher confidence)
+        confidence_score = max(0, min(100, 100 - risk + 20))
+        logger.info("Calculated confidence_score from risk_score: %s", confidence_score)
+    # Strategy 4: Extract from recommendation text
+    elif "recommendation" in memo_content:
+        rec_text = str(memo_content.get("recommendation", "")).upper()
+        if "INVEST" in rec_text and "STRONG" in rec_text:
+            confidence_score = 85
+        elif "INVEST" in rec_text:
+            confidence_score = 75
+        elif "WATCH" in rec_text:
+            confidence_score = 60
+        elif "PASS" in rec_text or "REJECT" in rec_text:
+            confidence_score = 40
+        else:
+            confidence_score = 70
+        logger.info("Derived confidence_score from recommendation text: %s", confidence_score)
+    
+    # Validate and set confidence_score
+    if confidence_score is None:
+        logger.warning("Could not determine confidence_score, using default: 75")
+        confidence_score = 75
+    
+    # Ensure it's a valid integer in range
+    try:
+        conf = int(float(confidence_score))  # Handle string numbers
+        confidence_score = max(0, min(100, conf))  # Clamp to 0-100
+    except (ValueError, TypeError) as e:
+        logger.warning("Invalid confidence_score format: %s, using 75. Error: %s", confidence_score, e)
+        confidence_score = 75
+    
+    memo_content["confidence_score"] = confidence_score
+    logger.info("Final confidence_score: %d", confidence_score)
+    return memo_content
+
+
+def _finish_memo(key: str, prompt: str, response_text: str) -> Dict[str, Any]:
+    """Turn an LLM response into memo content, caching real LLM output."""
+    memo_content = _parse_memo_response(response_text)
+    if memo_content is None:
         logger.warning("Using simulated response instead")
-        memo_content = json.loads(_simulated_llm_response(prompt))
+        return orjson.loads(_simulated_llm_response(prompt))
 
+    # Simulated fallbacks are never cached so a later real call can replace them
+    if MEMO_CACHE_DIR and response_text != _simulated_llm_response(prompt):
+        _memo_cache_put(key, memo_content)
     return memo_content
 
 
+def _memo_cache_key(prompt: str) -> str:
+    """Content address for a memo: the full prompt plus the LLM settings."""
+    provider, _, model = _llm_settings()
+    payload = "\0".join((prompt, MEMO_SYSTEM_PROMPT, provider, model))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _memo_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached memo for key, or None on a miss or when disabled."""
+    if not MEMO_CACHE_DIR:
+        return None
+    try:
+        memo_content = orjson.loads((Path(MEMO_CACHE_DIR) / f"{key}.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+    logger.info("Using cached deal memo %.12s", key)
+    return memo_content
+
+
+def _memo_cache_put(key: str, memo_content: Dict[str, Any]) -> None:
+    """Store a memo under key; cache errors are logged, never raised."""
+    cache_dir = Path(MEMO_CACHE_DIR)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp"
+        tmp_path.write_bytes(orjson.dumps(memo_content))
+        os.replace(tmp_path, cache_dir / f"{key}.json")
+    except OSError as e:
+        logger.warning("Could not write memo cache entry %.12s: %s", key, e)
+
+
 def render_memo_html(memo_content: Dict[str, Any], startup_data: Dict[str, Any]) -> str:
     """
     Render investment memo as HTML using Jinja2 template.
@@ -313,11 +950,7 @@ def render_memo_html(memo_content: Dict[str, Any], startup_data: Dict[str, Any])
     Returns:
         HTML string
     """
-    template_path = Path(__file__).parent / "memo_template.html"
-    with open(template_path, "r") as f:
-        template_str = f.read()
-
-    template = Template(template_str)
+    template = _TEMPLATE_ENV.get_template("memo_template.html")
 
     html = template.render(
         startup=startup_data,
@@ -328,6 +961,201 @@ def render_memo_html(memo_content: Dict[str, Any], startup_data: Dict[str, Any])
     return html
 
 
+def _sha256_blocks(data: bytes):
+    """Return a SHA-256 hasher fed data in blocks, without copying it."""
+    hasher = hashlib.sha256()
+    view = memoryview(data)
+    for offset in range(0, len(view), HASH_CHUNK_SIZE):
+        hasher.update(view[offset:offset + HASH_CHUNK_SIZE])
+    return hasher
+
+
+class _HashingBuffer(io.BytesIO):
+    """BytesIO that hashes bytes as they are written to it."""
+
+    def __init__(self):
+        super().__init__()
+        self.hasher = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.hasher.update(data)
+        return super().write(data)
+
+
+@functools.lru_cache(maxsize=None)
+def _pdf_styles():
+    """
+    Build the reportlab paragraph styles for memo PDFs once per process.
+
+    Returns:
+        Tuple of (title, heading1, heading2, normal) ParagraphStyle objects
+    """
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+
+    # Define custom styles
+    styles = getSampleStyleSheet()
+    
+    # Custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a202c'),
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    heading1_style = ParagraphStyle(
+        'CustomHeading1',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#1a202c'),
+        spaceAfter=12,
+        spaceBefore=12,
+        fontName='Helvetica-Bold'
+    )
+    
+    heading2_style = ParagraphStyle(
+        'CustomHeading2',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#2d3748'),
+        spaceAfter=8,
+        spaceBefore=10,
+        fontName='Helvetica-Bold'
+    )
+    
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor=colors.HexColor('#333333'),
+        spaceAfter=6,
+        leading=14,
+        alignment=TA_JUSTIFY
+    )
+
+    return title_style, heading1_style, heading2_style, normal_style
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class _MemoHTMLParser(HTMLParser):
+    """Extract headings, paragraphs and lists from memo HTML for the PDF."""
+
+    def __init__(self):
+        super().__init__()
+        self.elements = []
+        self.current_tag = None
+        self.current_text = []
+        self.in_header = False
+        self.in_paragraph = False
+        self.in_list = False
+        self.list_items = []
+        self.in_div = False
+        self.div_class = None
+        self.tag_stack = []
+
+    def handle_starttag(self, tag, attrs):
+        self.tag_stack.append(tag)
+        attrs_dict = dict(attrs)
+
+        if tag in ['h1', 'h2', 'h3', 'h4']:
+            self.in_header = True
+            self.current_tag = tag
+            self.current_text = []
+        elif tag == 'p':
+            self.in_paragraph = True
+            self.current_text = []
+        elif tag in ['ul', 'ol']:
+            self.in_list = True
+            self.list_items = []
+        elif tag == 'li':
+            self.current_text = []
+        elif tag == 'div':
+            self.in_div = True
+            self.div_class = attrs_dict.get('class', '')
+            self.current_text = []
+
+    def handle_endtag(self, tag):
+        if tag in self.tag_stack:
+            self.tag_stack.remove(tag)
+
+        if tag in ['h1', 'h2', 'h3', 'h4']:
+            if self.current_text:
+                text = ' '.join(self.current_text).strip()
+                if text:
+                    self.elements.append(('heading', tag, text))
+            self.in_header = False
+            self.current_tag = None
+            self.current_text = []
+        elif tag == 'p':
+            if self.current_text:
+                text = ' '.join(self.current_text).strip()
+                if text:
+                    self.elements.append(('paragraph', text))
+            self.in_paragraph = False
+            self.current_text = []
+        elif tag in ['ul', 'ol']:
+            if self.list_items:
+                self.elements.append(('list', self.list_items))
+            self.in_list = False
+            self.list_items = []
+        elif tag == 'li':
+            if self.current_text:
+                text = ' '.join(self.current_text).strip()
+                if text:
+                    self.list_items.append(text)
+            self.current_text = []
+        elif tag == 'div':
+            if self.current_text:
+                text = ' '.join(self.current_text).strip()
+                if text:
+                    # Handle special div classes
+                    if 'executive-summary' in self.div_class:
+                        self.elements.append(('paragraph', text))
+                    elif 'startup-info' in self.div_class or 'metadata' in self.div_class:
+                        # Skip metadata divs as they're handled separately
+                        pass
+                    elif 'recommendation' in self.div_class:
+                        self.elements.append(('paragraph', text))
+                    elif 'risk-item' in self.div_class:
+                        self.elements.append(('paragraph', text))
+                    elif 'swot-box' in self.div_class:
+                        # SWOT items are handled as lists
+                        pass
+                    else:
+                        # Generic div content
+                        self.elements.append(('paragraph', text))
+            self.in_div = False
+            self.div_class = None
+            self.current_text = []
+
+    def handle_data(self, data):
+        text = data.strip()
+        if text and text not in ['•', '-', '*']:  # Skip standalone bullet chars
+            self.current_text.append(text)
+
+
+class _HTMLTextStripper(HTMLParser):
+    """Collect all text from HTML, for PDFs of unstructured input."""
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+
+    def handle_data(self, data):
+        if data.strip():
+            self.text.append(data.strip())
+
+    def get_text(self):
+        return '\n\n'.join(self.text)
+
+
 def html_to_pdf(html_content: str) -> bytes:
     """
     Convert HTML to PDF using reportlab (pure Python, no system dependencies).
@@ -338,118 +1166,31 @@ def html_to_pdf(html_content: str) -> bytes:
     Returns:
         PDF bytes
     """
+    return html_to_pdf_and_hash(html_content)[0]
+
+
+def html_to_pdf_and_hash(html_content: str) -> Tuple[bytes, Any]:
+    """
+    Convert HTML to PDF and SHA-256 hash the output while it is written.
+
+    Args:
+        html_content: HTML string
+
+    Returns:
+        Tuple of (PDF bytes, sha256 hasher fed exactly those bytes), ready to
+        pass to upload_to_ipfs as content_hash
+    """
     try:
         from reportlab.lib.pagesizes import letter
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-        from html.parser import HTMLParser
-        import io
-        import re
-        
-        # Enhanced HTML parser to extract structure
-        class HTMLToPDFParser(HTMLParser):
-            def __init__(self):
-                super().__init__()
-                self.elements = []
-                self.current_tag = None
-                self.current_text = []
-                self.in_header = False
-                self.in_paragraph = False
-                self.in_list = False
-                self.list_items = []
-                self.in_div = False
-                self.div_class = None
-                self.tag_stack = []
-                
-            def handle_starttag(self, tag, attrs):
-                self.tag_stack.append(tag)
-                attrs_dict = dict(attrs)
-                
-                if tag in ['h1', 'h2', 'h3', 'h4']:
-                    self.in_header = True
-                    self.current_tag = tag
-                    self.current_text = []
-                elif tag == 'p':
-                    self.in_paragraph = True
-                    self.current_text = []
-                elif tag in ['ul', 'ol']:
-                    self.in_list = True
-                    self.list_items = []
-                elif tag == 'li':
-                    self.current_text = []
-                elif tag == 'div':
-                    self.in_div = True
-                    self.div_class = attrs_dict.get('class', '')
-                    self.current_text = []
-            
-            def handle_endtag(self, tag):
-                if tag in self.tag_stack:
-                    self.tag_stack.remove(tag)
-                
-                if tag in ['h1', 'h2', 'h3', 'h4']:
-                    if self.current_text:
-                        text = ' '.join(self.current_text).strip()
-                        if text:
-                            self.elements.append(('heading', tag, text))
-                    self.in_header = False
-                    self.current_tag = None
-                    self.current_text = []
-                elif tag == 'p':
-                    if self.current_text:
-                        text = ' '.join(self.current_text).strip()
-                        if text:
-                            self.elements.append(('paragraph', text))
-                    self.in_paragraph = False
-                    self.current_text = []
-                elif tag in ['ul', 'ol']:
-                    if self.list_items:
-                        self.elements.append(('list', self.list_items))
-                    self.in_list = False
-                    self.list_items = []
-                elif tag == 'li':
-                    if self.current_text:
-                        text = ' '.join(self.current_text).strip()
-                        if text:
-                            self.list_items.append(text)
-                    self.current_text = []
-                elif tag == 'div':
-                    if self.current_text:
-                        text = ' '.join(self.current_text).strip()
-                        if text:
-                            # Handle special div classes
-                            if 'executive-summary' in self.div_class:
-                                self.elements.append(('paragraph', text))
-                            elif 'startup-info' in self.div_class or 'metadata' in self.div_class:
-                                # Skip metadata divs as they're handled separately
-                                pass
-                            elif 'recommendation' in self.div_class:
-                                self.elements.append(('paragraph', text))
-                            elif 'risk-item' in self.div_class:
-                                self.elements.append(('paragraph', text))
-                            elif 'swot-box' in self.div_class:
-                                # SWOT items are handled as lists
-                                pass
-                            else:
-                                # Generic div content
-                                self.elements.append(('paragraph', text))
-                    self.in_div = False
-                    self.div_class = None
-                    self.current_text = []
-            
-            def handle_data(self, data):
-                text = data.strip()
-                if text and text not in ['•', '-', '*']:  # Skip standalone bullet chars
-                    self.current_text.append(text)
         
         # Parse HTML
-        parser = HTMLToPDFParser()
+        parser = _MemoHTMLParser()
         parser.feed(html_content)
         
-        # Create PDF
-        buffer = io.BytesIO()
+        # Create PDF; the buffer hashes output as reportlab writes it
+        buffer = _HashingBuffer()
         doc = SimpleDocTemplate(
             buffer,
             pagesize=letter,
@@ -459,49 +1200,7 @@ def html_to_pdf(html_content: str) -> bytes:
             bottomMargin=1*inch
         )
         
-        # Define custom styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a202c'),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        heading1_style = ParagraphStyle(
-            'CustomHeading1',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#1a202c'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        )
-        
-        heading2_style = ParagraphStyle(
-            'CustomHeading2',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#2d3748'),
-            spaceAfter=8,
-            spaceBefore=10,
-            fontName='Helvetica-Bold'
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=6,
-            leading=14,
-            alignment=TA_JUSTIFY
-        )
+        title_style, heading1_style, heading2_style, normal_style = _pdf_styles()
         
         # Build PDF content
         story = []
@@ -520,7 +1219,7 @@ def html_to_pdf(html_content: str) -> bytes:
             elif element_type == 'paragraph':
                 text = args[0]
                 # Clean up text
-                text = re.sub(r'\s+', ' ', text)
+                text = _WHITESPACE_RE.sub(' ', text)
                 if text:
                     story.append(Paragraph(text, normal_style))
                     story.append(Spacer(1, 0.1*inch))
@@ -536,19 +1235,7 @@ def html_to_pdf(html_content: str) -> bytes:
         if not story:
             logger.warning("Could not parse HTML structure, using simple text extraction")
             # Simple fallback: extract all text
-            class SimpleStripper(HTMLParser):
-                def __init__(self):
-                    super().__init__()
-                    self.text = []
-                
-                def handle_data(self, data):
-                    if data.strip():
-                        self.text.append(data.strip())
-                
-                def get_text(self):
-                    return '\n\n'.join(self.text)
-            
-            stripper = SimpleStripper()
+            stripper = _HTMLTextStripper()
             stripper.feed(html_content)
             text_content = stripper.get_text()
             
@@ -560,28 +1247,69 @@ def html_to_pdf(html_content: str) -> bytes:
         # Build PDF
         doc.build(story)
         pdf_bytes = buffer.getvalue()
-        logger.info(f"Generated PDF using reportlab: {len(pdf_bytes)} bytes")
-        return pdf_bytes
+        logger.info("Generated PDF using reportlab: %d bytes", len(pdf_bytes))
+        return pdf_bytes, buffer.hasher
         
     except ImportError:
         logger.error("reportlab not installed. Install with: pip install reportlab")
         logger.warning("Falling back to HTML format")
-        return html_content.encode('utf-8')
     except Exception as e:
-        logger.error(f"PDF generation failed: {e}")
+        logger.error("PDF generation failed: %s", e)
         logger.warning("Falling back to HTML format")
-        import traceback
-        logger.debug(f"Traceback: {traceback.format_exc()}")
-        return html_content.encode('utf-8')
+        logger.debug("Traceback:", exc_info=True)
+
+    fallback_bytes = html_content.encode('utf-8')
+    return fallback_bytes, _sha256_blocks(fallback_bytes)
+
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool for PDF rendering, creating it on first use."""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _PDF_POOL
+
+
+async def ahtml_to_pdf(html_content: str, use_processes: bool = False) -> bytes:
+    """
+    Render a PDF without blocking the event loop.
+
+    PDF layout is CPU-bound, so by default it runs in a worker thread, which
+    lets pending LLM calls progress. For large batches, use_processes=True
+    renders in a process pool to sidestep the GIL entirely.
+
+    Args:
+        html_content: HTML string
+        use_processes: Render in the shared process pool instead of a thread
+
+    Returns:
+        PDF bytes
+    """
+    if use_processes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_pdf_pool(), html_to_pdf, html_content)
+    return await asyncio.to_thread(html_to_pdf, html_content)
+
+
+async def ahtml_to_pdf_and_hash(html_content: str) -> Tuple[bytes, Any]:
+    """Async variant of html_to_pdf_and_hash, rendered in a worker thread."""
+    return await asyncio.to_thread(html_to_pdf_and_hash, html_content)
 
 
-def upload_to_ipfs(file_bytes: bytes, filename: str) -> str:
+def upload_to_ipfs(file_bytes: bytes, filename: str, content_hash=None) -> str:
     """
     Upload file to IPFS using Storacha CLI (no API token required).
 
     Args:
         file_bytes: File content as bytes
         filename: Name for the file
+        content_hash: Optional sha256 hasher already fed file_bytes (see
+            html_to_pdf_and_hash); saves rehashing for simulated uploads
 
     Returns:
         IPFS CID
@@ -589,14 +1317,14 @@ def upload_to_ipfs(file_bytes: bytes, filename: str) -> str:
     if DEMO_MODE:
         logger.warning(
             "DEMO_MODE enabled, simulating Storacha upload")
-        return _simulated_ipfs_upload(file_bytes, filename)
+        return _simulated_ipfs_upload(file_bytes, filename, content_hash)
 
     storacha_cmd = os.getenv("STORACHA_CLI", "storacha")
 
     if not shutil.which(storacha_cmd):
         logger.warning(
             "Storacha CLI not found. Install with `npm i -g @storacha/cli` and run `storacha login`.")
-        return _simulated_ipfs_upload(file_bytes, filename)
+        return _simulated_ipfs_upload(file_bytes, filename, content_hash)
 
     tmp_path = None
     try:
@@ -610,7 +1338,7 @@ def upload_to_ipfs(file_bytes: bytes, filename: str) -> str:
         if os.getenv("STORACHA_NO_WRAP", "true").lower() == "true":
             cmd.append("--no-wrap")
 
-        logger.info(f"Uploading to Storacha via CLI: {' '.join(cmd)}")
+        logger.info("Uploading to Storacha via CLI: %s", " ".join(cmd))
         result = subprocess.run(
             cmd,
             capture_output=True,
@@ -622,50 +1350,52 @@ def upload_to_ipfs(file_bytes: bytes, filename: str) -> str:
 
         if result.returncode != 0:
             logger.error(
-                f"Storacha CLI upload failed ({result.returncode}): {output.strip()[:400]}")
-            return _simulated_ipfs_upload(file_bytes, filename)
+                "Storacha CLI upload failed (%d): %.400s", result.returncode, output.strip())
+            return _simulated_ipfs_upload(file_bytes, filename, content_hash)
 
-        cid_match = re.search(
-            r"storacha\.link/ipfs/([a-zA-Z0-9]+)", output)
+        cid_match = STORACHA_LINK_CID_RE.search(output)
         if not cid_match:
-            cid_match = re.search(r"(bafy[a-zA-Z0-9]+)", output)
+            cid_match = BARE_CID_RE.search(output)
 
         if cid_match:
             cid = cid_match.group(1)
-            logger.info(f"Uploaded to Storacha/IPFS: {cid}")
+            logger.info("Uploaded to Storacha/IPFS: %s", cid)
             return cid
 
         logger.error(
-            f"Could not parse CID from Storacha CLI output: {output.strip()[:400]}")
-        return _simulated_ipfs_upload(file_bytes, filename)
+            "Could not parse CID from Storacha CLI output: %.400s", output.strip())
+        return _simulated_ipfs_upload(file_bytes, filename, content_hash)
 
     except FileNotFoundError:
         logger.warning(
             "Storacha CLI executable not found. Falling back to simulated CID.")
-        return _simulated_ipfs_upload(file_bytes, filename)
+        return _simulated_ipfs_upload(file_bytes, filename, content_hash)
     except subprocess.TimeoutExpired:
         logger.error("Storacha CLI upload timed out.")
-        return _simulated_ipfs_upload(file_bytes, filename)
+        return _simulated_ipfs_upload(file_bytes, filename, content_hash)
     except Exception as e:
-        logger.error(f"Storacha upload failed: {e}")
+        logger.error("Storacha upload failed: %s", e)
         logger.warning("Falling back to simulated CID")
-        return _simulated_ipfs_upload(file_bytes, filename)
+        return _simulated_ipfs_upload(file_bytes, filename, content_hash)
     finally:
         if tmp_path and os.path.exists(tmp_path):
             try:
                 os.unlink(tmp_path)
             except OSError:
-                logger.debug(f"Could not remove temp file {tmp_path}")
+                logger.debug("Could not remove temp file %s", tmp_path)
 
 
-def _simulated_ipfs_upload(file_bytes: bytes, filename: str) -> str:
+def _simulated_ipfs_upload(file_bytes: bytes, filename: str, content_hash=None) -> str:
     """Generate a simulated IPFS CID for demo purposes."""
-    # Generate base32-encoded hash to avoid non-base32 characters
-    content_hash = hashlib.sha256(file_bytes + filename.encode()).digest()
+    # Generate base32-encoded hash to avoid non-base32 characters. Reuse the
+    # hash taken while the PDF was written when we have one.
+    hasher = content_hash.copy() if content_hash is not None else _sha256_blocks(file_bytes)
+    hasher.update(filename.encode())
+    content_hash = hasher.digest()
     base32_hash = base64.b32encode(content_hash).decode("utf-8").lower().rstrip("=")
     # Use a distinct prefix so UI can still detect demo CIDs
     cid = f"bafysim{base32_hash[:52]}"
-    logger.info(f"[SIMULATED] Generated IPFS CID: {cid}")
+    logger.info("[SIMULATED] Generated IPFS CID: %s", cid)
     return cid
 
 
@@ -682,37 +1412,38 @@ def submit_to_backend(submission_data: Dict[str, Any]) -> Dict[str, Any]:
     backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
     endpoint = f"{backend_url}/submit-memo"
 
-    logger.info(f"Submitting to backend: {endpoint}")
-    logger.debug(f"Submission data keys: {list(submission_data.keys())}")
+    logger.info("Submitting to backend: %s", endpoint)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Submission data keys: %s", list(submission_data))
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             endpoint,
             json=submission_data,
-            timeout=30
+            timeout=BACKEND_TIMEOUT
         )
         
-        logger.debug(f"Backend response status: {response.status_code}")
+        logger.debug("Backend response status: %d", response.status_code)
         
         if not response.ok:
             error_text = response.text[:500]
-            logger.error(f"Backend returned error {response.status_code}: {error_text}")
+            logger.error("Backend returned error %d: %s", response.status_code, error_text)
             raise requests.exceptions.HTTPError(f"Backend error {response.status_code}: {error_text}")
         
         response.raise_for_status()
 
-        result = response.json()
+        result = orjson.loads(response.content)
         proposal_id = result.get('id')
-        logger.info(f"✅ Successfully submitted to backend: Proposal ID {proposal_id}")
-        logger.debug(f"Full response: {result}")
+        logger.info("✅ Successfully submitted to backend: Proposal ID %s", proposal_id)
+        logger.debug("Full response: %s", result)
         
         if not proposal_id or proposal_id == 1:
-            logger.warning(f"⚠️  Received proposal_id={proposal_id}, might be simulated response")
+            logger.warning("⚠️  Received proposal_id=%s, might be simulated response", proposal_id)
         
         return result
 
     except requests.exceptions.ConnectionError as e:
-        logger.error(f"❌ Could not connect to backend at {backend_url}: {e}")
+        logger.error("❌ Could not connect to backend at %s: %s", backend_url, e)
         logger.warning(
             "Make sure the backend is running: uvicorn backend.app.main:app --reload")
         # Return simulated response for demo
@@ -721,19 +1452,18 @@ def submit_to_backend(submission_data: Dict[str, Any]) -> Dict[str, Any]:
             "status": "simulated - backend not available",
             **submission_data
         }
-        logger.warning(f"⚠️  Returning simulated response: {simulated}")
+        logger.warning("⚠️  Returning simulated response: %s", simulated)
         return simulated
     except requests.exceptions.Timeout:
-        logger.error(f"❌ Backend request timed out after 30 seconds")
+        logger.error("❌ Backend request timed out after %s seconds", BACKEND_TIMEOUT[1])
         return {
             "id": 1,
             "status": "failed - timeout",
             "error": "Backend request timed out"
         }
     except Exception as e:
-        logger.error(f"❌ Backend submission failed: {type(e).__name__}: {e}")
-        import traceback
-        logger.debug(f"Traceback: {traceback.format_exc()}")
+        logger.error("❌ Backend submission failed: %s: %s", type(e).__name__, e)
+        logger.debug("Traceback:", exc_info=True)
         return {
             "id": 1,
             "status": "failed",
@@ -26,7 +26,7 @@ else:
 from agent_utils import (
     generate_deal_memo,
     render_memo_html,
-    html_to_pdf,
+    html_to_pdf_and_hash,
     upload_to_ipfs,
     submit_to_backend
 )
@@ -84,12 +84,12 @@ def process_startup_data(startup_data: dict, submit_callback=None) -> dict:
 
     # Step 3: Convert HTML to PDF
     logger.info("Converting to PDF...")
-    pdf_bytes = html_to_pdf(html_content)
+    pdf_bytes, pdf_hash = html_to_pdf_and_hash(html_content)
 
     # Step 4: Upload to IPFS
     logger.info("Uploading to IPFS...")
     ipfs_cid = upload_to_ipfs(
-        pdf_bytes, f"{startup_data.get('name', 'memo')}.pdf")
+        pdf_bytes, f"{startup_data.get('name', 'memo')}.pdf", content_hash=pdf_hash)
 
     # Step 5: Prepare submission data (add category/tags for frontend filters)
     sector = startup_data.get("sector", "unknown")
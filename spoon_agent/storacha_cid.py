@@ -0,0 +1,10 @@
+"""
+CID patterns for Storacha CLI output, shared by the agent and the backend.
+"""
+
+import re
+
+# Prefer the gateway link anywhere in the output, and only fall back to the
+# first bare CID when there is none
+STORACHA_LINK_CID_RE = re.compile(r"storacha\.link/ipfs/([a-zA-Z0-9]+)")
+BARE_CID_RE = re.compile(r"(bafy[a-zA-Z0-9]+)")
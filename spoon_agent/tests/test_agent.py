@@ -14,6 +14,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from agent_utils import (
     llm_call,
     generate_deal_memo,
+    batch_generate_memos,
+    generate_deal_memos_batch,
     render_memo_html,
     html_to_pdf,
     upload_to_ipfs,
@@ -21,13 +23,16 @@ from agent_utils import (
 )
 
 
-@patch('agent_utils.requests.post')
+@patch('agent_utils._SESSION.post')
 def test_llm_call_openai(mock_post):
     """Test LLM call with OpenAI provider."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {
-        "choices": [{"message": {"content": "Test response"}}]
-    }
+    mock_response.iter_lines.return_value = [
+        b'data: ' + json.dumps({"choices": [{"delta": {"content": "Test "}}]}).encode(),
+        b'',
+        b'data: ' + json.dumps({"choices": [{"delta": {"content": "response"}}]}).encode(),
+        b'data: [DONE]'
+    ]
     mock_post.return_value = mock_response
     
     with patch.dict('os.environ', {
@@ -40,6 +45,29 @@ def test_llm_call_openai(mock_post):
         mock_post.assert_called_once()
 
 
+@patch('agent_utils._SESSION.post')
+def test_llm_call_malformed_response_falls_back(mock_post):
+    """Test a malformed provider body falls back to the simulated response."""
+    mock_response = MagicMock()
+    mock_response.iter_lines.return_value = [
+        b'data: ' + json.dumps({"choices": None}).encode(),
+        b'data: ' + json.dumps({"choices": [{"delta": {"content": {"text": "not a string"}}}]}).encode(),
+        b'data: [DONE]'
+    ]
+    mock_post.return_value = mock_response
+
+    with patch.dict('os.environ', {
+        'LLM_PROVIDER': 'openai',
+        'OPENAI_API_KEY': 'test-key',
+        'LLM_MODEL': 'gpt-4'
+    }):
+        result = llm_call("Test prompt")
+
+    data = json.loads(result)
+    assert "executive_summary" in data
+    mock_post.assert_called_once()
+
+
 def test_llm_call_simulation():
     """Test LLM call falls back to simulation when no API key."""
     with patch.dict('os.environ', {}, clear=True):
@@ -87,6 +115,98 @@ def test_generate_deal_memo():
         mock_llm.assert_called_once()
 
 
+def test_batch_generate_memos_preserves_order():
+    """Test concurrent memo generation returns one memo per startup, in order."""
+    startups = [{"name": f"Startup{i}"} for i in range(3)]
+
+    async def fake_allm_call(prompt, system_prompt=None):
+        name = next(s["name"] for s in startups if f'"{s["name"]}"' in prompt)
+        return json.dumps({"executive_summary": name, "confidence_score": 70})
+
+    with patch('agent_utils.allm_call', side_effect=fake_allm_call) as mock_llm:
+        results = batch_generate_memos(startups)
+
+    assert [r["executive_summary"] for r in results] == ["Startup0", "Startup1", "Startup2"]
+    assert mock_llm.call_count == 3
+
+
+def test_batch_generate_memos_closes_only_its_own_client():
+    """A client opened for the batch is closed; one the loop already had is left alone."""
+    import asyncio
+    import agent_utils
+
+    clients = []
+
+    async def fake_allm_call(prompt, system_prompt=None):
+        clients.append(agent_utils._async_client())
+        return json.dumps({"executive_summary": "memo", "confidence_score": 70})
+
+    with patch('agent_utils.allm_call', side_effect=fake_allm_call):
+        batch_generate_memos([{"name": "Startup0"}])
+        assert clients[-1].is_closed
+
+        async def with_shared_client():
+            shared = agent_utils._async_client()
+            await agent_utils.abatch_generate_memos([{"name": "Startup1"}])
+            try:
+                return shared, shared.is_closed
+            finally:
+                await shared.aclose()
+
+        shared, closed = asyncio.run(with_shared_client())
+
+    assert clients[-1] is shared
+    assert not closed
+
+
+def test_generate_deal_memos_batch():
+    """Test batched memo generation packs startups per call and falls back per startup on a bad batch."""
+    startups = [{"name": f"Startup{i}"} for i in range(4)]
+    batch_response = json.dumps([
+        {"startup_name": "Startup0", "executive_summary": "Startup0", "confidence_score": "82"},
+        {"startup_name": "startup1", "executive_summary": "Startup1", "risk_score": 40}
+    ])
+    # A single memo whose inner list must not be mistaken for the batch array
+    not_a_batch = json.dumps({
+        "executive_summary": "Startup2",
+        "risks": [{"category": "Market"}, {"category": "Team"}]
+    })
+    single_responses = [
+        json.dumps({"executive_summary": "Startup2", "confidence_score": 65}),
+        json.dumps({"executive_summary": "Startup3", "confidence_score": 55})
+    ]
+
+    with patch('agent_utils.llm_call',
+               side_effect=[batch_response, not_a_batch] + single_responses) as mock_llm:
+        results = generate_deal_memos_batch(startups, batch_size=2)
+
+    assert [r["executive_summary"] for r in results] == ["Startup0", "Startup1", "Startup2", "Startup3"]
+    assert [r["confidence_score"] for r in results] == [82, 80, 65, 55]
+    # One call per batch, then one per startup of the rejected batch
+    assert mock_llm.call_count == 4
+    assert '"Startup2"' in mock_llm.call_args_list[2].args[0]
+    assert '"Startup3"' not in mock_llm.call_args_list[2].args[0]
+
+
+def test_generate_deal_memos_batch_rejects_reordered_reply():
+    """Test a batch whose memos come back in the wrong order falls back per startup."""
+    startups = [{"name": "Alpha"}, {"name": "Beta"}]
+    swapped = json.dumps([
+        {"startup_name": "Beta", "executive_summary": "Beta", "confidence_score": 90},
+        {"startup_name": "Alpha", "executive_summary": "Alpha", "confidence_score": 30}
+    ])
+    single_responses = [
+        json.dumps({"executive_summary": "Alpha", "confidence_score": 30}),
+        json.dumps({"executive_summary": "Beta", "confidence_score": 90})
+    ]
+
+    with patch('agent_utils.llm_call', side_effect=[swapped] + single_responses) as mock_llm:
+        results = generate_deal_memos_batch(startups, batch_size=2)
+
+    assert [(r["executive_summary"], r["confidence_score"]) for r in results] == [("Alpha", 30), ("Beta", 90)]
+    assert mock_llm.call_count == 3
+
+
 def test_render_memo_html():
     """Test HTML rendering from memo content."""
     memo_content = {
@@ -178,15 +298,15 @@ def test_upload_to_ipfs_real(mock_run, _mock_which):
     mock_run.assert_called_once()
 
 
-@patch('agent_utils.requests.post')
+@patch('agent_utils._SESSION.post')
 def test_submit_to_backend_success(mock_post):
     """Test successful backend submission."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {
+    mock_response.content = json.dumps({
         "id": 1,
         "status": "active",
         "title": "Test Proposal"
-    }
+    }).encode()
     mock_post.return_value = mock_response
     
     submission_data = {
@@ -204,7 +324,7 @@ def test_submit_to_backend_success(mock_post):
     mock_post.assert_called_once()
 
 
-@patch('agent_utils.requests.post')
+@patch('agent_utils._SESSION.post')
 def test_submit_to_backend_connection_error(mock_post):
     """Test backend submission handles connection errors."""
     mock_post.side_effect = Exception("Connection refused")